@@ -1,19 +1,17 @@
 from aiogram.filters import BaseFilter
 from aiogram.types import Message
 
-from core.managers import ConfigManager
-from core.managers import UserManager
+from core.models import User
 from utils.app.message import send_message
 from ..keyboards import phone_number_keyboard
 
 
-async def check_user_exists(user_manager: UserManager, user_id: int, message: Message) -> bool:
-    try:
-        if await user_manager.user_exists(user_id=user_id):
-            return True
-    except Exception as e:
+async def check_user_exists(current_user: User | None, auth_error: bool, message: Message) -> bool:
+    if current_user is not None:
+        return True
+
+    if auth_error:
         await send_message(message, text=f"❌ Произошла ошибка при проверке регистрации.",)
-        ConfigManager.log.logger.error(f"{e}\n❌ Произошла ошибка при проверке регистрации. ID пользователя: {user_id}")
         return False
 
     await send_message(
@@ -29,26 +27,16 @@ class RoleFilter(BaseFilter):
     def __init__(self, role: str):
         self.role = role
 
-    async def __call__(self, message: Message, user_manager: UserManager) -> bool:
-        user_id = message.from_user.id
-
-        if not await check_user_exists(user_manager, user_id, message):
+    async def __call__(self, message: Message, current_user: User | None = None, auth_error: bool = False) -> bool:
+        if not await check_user_exists(current_user, auth_error, message):
             return False
 
-        try:
-            is_role = await user_manager.get_parameters(user_id=user_id, get_role=True) == self.role
-        except Exception as e:
-            await send_message(message, text=f"❌ Произошла ошибка при проверке роли.")
-            ConfigManager.log.logger.error(f"{e}\n❌ Произошла ошибка при проверке роли.\nID пользователя: {user_id}\nРоль: {self.role}")
-            return False
-        
-        return is_role
+        return current_user.role == self.role
     
 
 class ExistsFilter(BaseFilter):
-    async def __call__(self, message: Message, user_manager: UserManager) -> bool:
-        user_id = message.from_user.id
-        is_exists = await check_user_exists(user_manager, user_id, message)
+    async def __call__(self, message: Message, current_user: User | None = None, auth_error: bool = False) -> bool:
+        is_exists = await check_user_exists(current_user, auth_error, message)
         return is_exists
 
 
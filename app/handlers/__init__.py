@@ -6,6 +6,7 @@ from .admin.bus import routers as admin_bus_routers
 from .admin.google_sheet import routers as admin_google_sheet_routers
 from .admin.log import routers as log_routers
 from .admin.app_config import routers as app_config_routers
+from .admin.performance import routers as performance_routers
 
 
 routers = [
@@ -16,5 +17,6 @@ routers = [
     *admin_google_sheet_routers,
     *admin_user_routers,
     *log_routers,
-    *app_config_routers
+    *app_config_routers,
+    *performance_routers
 ]
\ No newline at end of file
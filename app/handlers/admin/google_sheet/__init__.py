@@ -1,10 +1,12 @@
 from .get_data import router as data_router
 from .get_stats import router as statistics_router
 from .delete import router as delete_router
+from .export import router as export_router
 
 
 routers = [
     data_router,
     statistics_router,
-    delete_router
+    delete_router,
+    export_router
 ]
\ No newline at end of file
@@ -2,7 +2,7 @@ from aiogram import F, Router
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
-from core.managers import GoogleSheetsManager, ConfigManager
+from core.managers import RegistrationsManager, ConfigManager
 from utils.app import send_message, edit_message
 from ....keyboards.admin import confirm_delete_keyboard
 from ....states.admin import AdminSheetsStates
@@ -26,7 +26,7 @@ async def cb_delete_data_start(query: CallbackQuery, state: FSMContext):
 async def handle_delete_data(
     message: Message,
     state: FSMContext,
-    sheets_manager: GoogleSheetsManager
+    registrations_manager: RegistrationsManager
 ):
     days_str = message.text.strip()
 
@@ -39,7 +39,7 @@ async def handle_delete_data(
         await send_message(message, "❌ Неверный формат числа. Введите целое число.")
         return
     try:
-        current_data = await sheets_manager.get_filters_data(first_days_count=days)
+        current_data = await registrations_manager.get_filters_data(first_days_count=days)
         if not current_data or len(current_data) <= 1:
             await send_message(message, "❌ В таблице нет данных для удаления.")
             await state.clear()
@@ -89,7 +89,7 @@ async def handle_delete_data(
 async def handle_confirm_delete_yes(
     query: CallbackQuery,
     state: FSMContext,
-    sheets_manager: GoogleSheetsManager
+    registrations_manager: RegistrationsManager
 ):
     data = await state.get_data()
     days = data.get('days_to_delete')
@@ -104,7 +104,7 @@ async def handle_confirm_delete_yes(
             f"Удаляется {days} дней, записей: {records_count}"
         )
         
-        await sheets_manager.clear_first_n_days(days)
+        await registrations_manager.clear_first_n_days(days)
         
         await edit_message(
             query.message,
@@ -0,0 +1,66 @@
+from contextlib import aclosing
+
+from aiogram import F, Router
+from aiogram.types import Message, CallbackQuery
+from aiogram.fsm.context import FSMContext
+
+from core.managers import RegistrationsManager, ConfigManager
+from utils.app import send_message, edit_message
+from utils.file_tools import ReportWriter, write_registrations_export, generate_file_name, EXPORT_FORMATS
+from ....states.admin import AdminSheetsStates
+from ....filters import admin_filter
+from ....keyboards.admin import sheets_export_format_keyboard, sheets_stats_date_filter_keyboard
+
+
+router = Router()
+
+@router.callback_query(F.data == "sheets:export", admin_filter())
+async def cb_export_start(query: CallbackQuery, state: FSMContext):
+    await state.clear()
+    await edit_message(
+        query.message,
+        "📥 **Экспорт данных**\n\n"
+        "Выберите формат файла:",
+        reply_markup=sheets_export_format_keyboard
+    )
+
+@router.callback_query(F.data.startswith("sheets:export_format:"), admin_filter())
+async def cb_export_format(query: CallbackQuery, state: FSMContext):
+    export_format = query.data.split(":")[-1]
+    if export_format not in EXPORT_FORMATS:
+        await edit_message(query.message, "❌ Неизвестный формат экспорта.")
+        return
+
+    await state.update_data(export_format=export_format)
+    await state.set_state(AdminSheetsStates.waiting_for_stats_date_filter_type)
+    await edit_message(
+        query.message,
+        "📥 **Экспорт данных**\n\n"
+        "Выберите тип фильтрации по датам:",
+        reply_markup=sheets_stats_date_filter_keyboard
+    )
+
+async def send_export(
+    message: Message,
+    filter_params: dict,
+    export_format: str,
+    registrations_manager: RegistrationsManager
+):
+    with ReportWriter() as report:
+        try:
+            # aclosing returns the reader connection even when the writer fails midway
+            async with aclosing(registrations_manager.iter_filters_data(**filter_params)) as records:
+                rows_count = await write_registrations_export(records, export_format, report)
+        except Exception as e:
+            ConfigManager.log.logger.error(f"{e}\n❌ Ошибка при экспорте данных в формате {export_format}")
+            await send_message(message, "❌ **Произошла ошибка!** Не удалось выгрузить данные.")
+            return
+
+        if not rows_count:
+            await send_message(message, "📭 **Нет данных**, соответствующих выбранным фильтрам.")
+            return
+
+        await message.answer_document(
+            report.as_input_file(f"{generate_file_name('registrations')}.{EXPORT_FORMATS[export_format]}"),
+            caption=f"📁 Экспорт данных ({rows_count} записей)."
+        )
@@ -1,11 +1,14 @@
+from contextlib import aclosing
 from datetime import date
 import io
 
 from aiogram import F, Router
-from aiogram.types import Message, CallbackQuery, BufferedInputFile
+from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
-from core.managers import GoogleSheetsManager, ConfigManager
+from core.managers import RegistrationsManager, ConfigManager
+from core.models import REGISTRATION_HEADER
+from utils.file_tools import ReportWriter
 from utils.app import send_message, edit_message
 from ....states.admin import AdminSheetsStates
 from ....filters import admin_filter
@@ -34,7 +37,7 @@ async def cb_get_data_start(query: CallbackQuery, state: FSMContext):
 async def handle_get_data(
     message: Message,
     state: FSMContext,
-    sheets_manager: GoogleSheetsManager
+    registrations_manager: RegistrationsManager
 ):
     days_str = message.text.strip()
     await state.clear()
@@ -52,64 +55,53 @@ async def handle_get_data(
         return
 
     try:
-        data = await sheets_manager.get_filters_data(last_days_count=days)
-
+        passenger_sums = await registrations_manager.get_passenger_sums(
+            ["driver_name", "bus_number"],
+            last_days_count=days
+        )
     except Exception as e:
         ConfigManager.log.logger.error(f"{e}\n❌ Ошибка при получении данных таблицы.")
         await send_message(message, "❌ Произошла ошибка при получении данных из таблицы.")
         return
 
-    if not data:
+    if not passenger_sums:
         await send_message(message, "📭 **Нет данных**")
         return
 
-    header = data[0]
-    records = data[1:]
-    
-    stats = {}
-    total_passengers = 0
-    
-    for record in records:
-        if len(record) > 5 and record[5].isdigit():
-            passengers = int(record[5])
-            total_passengers += passengers
-            
-            driver_name = record[2] if len(record) > 2 else "Неизвестно"
-            bus_number = record[3] if len(record) > 3 else "Неизвестно"
-            if (driver_name, bus_number) in stats:
-                stats[(driver_name, bus_number)] += passengers
-            else:
-                stats[(driver_name, bus_number)] = passengers
+    stats = {(driver_name, bus_number): passengers for driver_name, bus_number, passengers, _ in passenger_sums}
+    total_passengers = sum(stats.values())
+    records_count = sum(rows_count for *_, rows_count in passenger_sums)
 
-    stats_text = (
+    stats_lines = [
         f"📊 Данные из таблицы\n"
-        f"📈 Всего записей: {len(records)}\n\n"
-        f"👥 Статистика:\n"
-    )
+        f"📈 Всего записей: {records_count}\n\n"
+        f"👥 Статистика:"
+    ]
     
     for name, count in sorted(stats.items(), key=lambda x: x[1], reverse=True):
-        stats_text += f"• Водитель - {name[0]}, автобус - {name[1]}: {count} пассажиров\n"
+        stats_lines.append(f"• Водитель - {name[0]}, автобус - {name[1]}: {count} пассажиров")
     
-    stats_text += f"\nОбщее количество пассажиров: {total_passengers}"
-
-    await send_message(message, stats_text)
-
-    detailed_text = ""
-
-    for i, record in enumerate(records, 1):
-        row_text = "\n".join(
-            [f"{header[j]}: {record[j]}" for j in range(len(header))]
-        )
-        detailed_text += f"Запись {i}:\n{row_text}\n\n"
-
-    if len(detailed_text) > 4000:
-        file_data = detailed_text.encode('utf-8')
-        
-        file = BufferedInputFile(file_data, filename="table_data.txt")
-        
-        await message.answer_document(
-            file,
-            caption=f"📁 Данные таблицы ({len(records)} записей)."
-        )
-    else:
-        await send_message(message, detailed_text)
\ No newline at end of file
+    stats_lines.append(f"\nОбщее количество пассажиров: {total_passengers}")
+
+    await send_message(message, "\n".join(stats_lines))
+
+    with ReportWriter() as report:
+        try:
+            records_count = 0
+            async with aclosing(registrations_manager.iter_filters_data(last_days_count=days)) as records:
+                async for record in records:
+                    records_count += 1
+                    row_text = "\n".join(f"{title}: {value}" for title, value in zip(REGISTRATION_HEADER, record))
+                    report.write(f"Запись {records_count}:\n{row_text}\n\n")
+        except Exception as e:
+            ConfigManager.log.logger.error(f"{e}\n❌ Ошибка при получении данных таблицы.")
+            await send_message(message, "❌ Произошла ошибка при получении данных из таблицы.")
+            return
+
+        if report.length > 4000:
+            await message.answer_document(
+                report.as_input_file("table_data.txt"),
+                caption=f"📁 Данные таблицы ({records_count} записей)."
+            )
+        else:
+            await send_message(message, report.getvalue())
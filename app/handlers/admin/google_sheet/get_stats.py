@@ -1,13 +1,15 @@
 from datetime import date
 
 from aiogram import F, Router
-from aiogram.types import Message, CallbackQuery, BufferedInputFile
+from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
-from core.managers import GoogleSheetsManager, ConfigManager
+from core.managers import RegistrationsManager, ConfigManager
 from core.managers.bus_stops_manager import BusStopsManager
 from utils.app import send_message, edit_message, delete_message
+from utils.file_tools import ReportWriter
 from utils.text.processing import validate_date
+from .export import send_export
 from ....states.admin import AdminSheetsStates
 from ....filters import admin_filter
 from ....keyboards.admin import (
@@ -20,6 +22,7 @@ router = Router()
 
 @router.callback_query(F.data == "sheets:get_stats", admin_filter())
 async def cb_get_stats_start(query: CallbackQuery, state: FSMContext):
+    await state.clear()
     await state.set_state(AdminSheetsStates.waiting_for_stats_date_filter_type)
     await edit_message(
         query.message,
@@ -28,6 +31,17 @@ async def cb_get_stats_start(query: CallbackQuery, state: FSMContext):
         reply_markup=sheets_stats_date_filter_keyboard
     )
 
+@router.callback_query(F.data == "sheets:rebuild_rollups", admin_filter())
+async def cb_rebuild_rollups(query: CallbackQuery, registrations_manager: RegistrationsManager):
+    try:
+        await registrations_manager.rebuild_rollups()
+    except Exception as e:
+        ConfigManager.log.logger.error(f"{e}\n❌ Ошибка при пересчете статистики администратором ID: {query.from_user.id}")
+        await edit_message(query.message, "❌ Произошла ошибка при пересчете статистики.")
+        return
+
+    await edit_message(query.message, "✅ Статистика пересчитана по всем записям.")
+
 @router.callback_query(F.data.startswith("sheets:stats_date_filter:"), AdminSheetsStates.waiting_for_stats_date_filter_type, admin_filter())
 async def cb_stats_date_filter_type(query: CallbackQuery, state: FSMContext):
     filter_type = query.data.split(":")[-1]
@@ -171,7 +185,7 @@ async def ask_stats_bus_filter(message: Message, state: FSMContext):
 async def cb_stats_bus_filter(
     query: CallbackQuery,
     state: FSMContext,
-    sheets_manager: GoogleSheetsManager,
+    registrations_manager: RegistrationsManager,
     bus_stops_manager: BusStopsManager
 ):
     bus_filter = query.data.split(":")[-1]
@@ -196,10 +210,10 @@ async def cb_stats_bus_filter(
     else:
         await delete_message(query.message)
         await state.update_data(bus_filter=bus_filter)
-        await show_stats_data(query.message, state, sheets_manager)
+        await show_stats_data(query.message, state, registrations_manager)
 
 @router.message(AdminSheetsStates.waiting_for_stats_bus_numbers, admin_filter())
-async def handle_stats_bus_numbers(message: Message, state: FSMContext, sheets_manager: GoogleSheetsManager):
+async def handle_stats_bus_numbers(message: Message, state: FSMContext, registrations_manager: RegistrationsManager):
     bus_numbers_str = message.text.strip()
     
     if bus_numbers_str == "0":
@@ -213,101 +227,84 @@ async def handle_stats_bus_numbers(message: Message, state: FSMContext, sheets_m
         return
     
     await state.update_data(bus_filter="specific", bus_numbers=bus_numbers)
-    await show_stats_data(message, state, sheets_manager)
+    await show_stats_data(message, state, registrations_manager)
 
-async def show_stats_data(message: Message, state: FSMContext, sheets_manager: GoogleSheetsManager):
+async def show_stats_data(message: Message, state: FSMContext, registrations_manager: RegistrationsManager):
     data = await state.get_data()
     await state.clear()
     
+    filter_params = _build_filter_params(data)
+    if data.get("export_format"):
+        await send_export(message, filter_params, data["export_format"], registrations_manager)
+        return
+    
     try:
-        filter_params = {}
-        
-        date_filter_type = data.get("date_filter_type")
-        if date_filter_type == "specific":
-            filter_params["date_str"] = data.get("specific_date")
-        elif date_filter_type == "first_days":
-            filter_params["first_days_count"] = data.get("first_days_count")
-        elif date_filter_type == "last_days":
-            filter_params["last_days_count"] = data.get("last_days_count")
-        elif date_filter_type == "date_range":
-            filter_params["start_date_str"] = data.get("start_date")
-            filter_params["end_date_str"] = data.get("end_date")
-        
-        bus_filter = data.get("bus_filter")
-        if bus_filter == "specific":
-            filter_params["bus_numbers"] = data.get("bus_numbers")
+        passenger_sums = await registrations_manager.get_passenger_sums(["date", "bus_number"], **filter_params)
         
-        sheets_data = await sheets_manager.get_filters_data(**filter_params)
-        
-        if not sheets_data or len(sheets_data) <= 1:
+        if not passenger_sums:
             await send_message(message, "📭 **Нет данных**, соответствующих выбранным фильтрам.")
             return
         
-        records = sheets_data[1:]
-        
         stats_by_date = {}
+        records_count = 0
         
-        for record in records:
-            if len(record) < 6:
-                continue
-                
-            date_val = record[0]
-            bus_number = record[3] if len(record) > 3 else "Неизвестно"
-            passengers_str = record[5] if len(record) > 5 else "0"
-            
-            if not passengers_str.isdigit():
-                continue
-                
-            passengers = int(passengers_str)
-            
-            if date_val not in stats_by_date:
-                stats_by_date[date_val] = {}
-            
-            if bus_number not in stats_by_date[date_val]:
-                stats_by_date[date_val][bus_number] = 0
-                
-            stats_by_date[date_val][bus_number] += passengers
+        for date_val, bus_number, passengers, rows_count in passenger_sums:
+            stats_by_date.setdefault(date_val, {})[bus_number] = passengers
+            records_count += rows_count
         
         filters_text = _build_stats_filters_text(data)
         total_passengers_all = 0
         
-        text = (
-            f"📈 Статистика по пассажирам\n\n"
-            f"Примененные фильтры:\n{filters_text}\n\n"
-        )
-        
-        for date_val in sorted(stats_by_date.keys()):
-            date_stats = stats_by_date[date_val]
-            total_passengers_date = sum(date_stats.values())
-            total_passengers_all += total_passengers_date
-            
-            text += f"📅 Дата: {date_val}\n"
-            text += f"🚌 По автобусам:\n"
+        with ReportWriter() as report:
+            report.write(
+                f"📈 Статистика по пассажирам\n\n"
+                f"Примененные фильтры:\n{filters_text}\n\n"
+            )
             
-            for bus_number in sorted(date_stats.keys()):
-                passengers = date_stats[bus_number]
-                text += f"   • {bus_number}: {passengers} пассажиров\n"
+            for date_val in sorted(stats_by_date.keys()):
+                date_stats = stats_by_date[date_val]
+                total_passengers_date = sum(date_stats.values())
+                total_passengers_all += total_passengers_date
+                
+                report.write(f"📅 Дата: {date_val}\n🚌 По автобусам:\n")
+                for bus_number in sorted(date_stats.keys()):
+                    report.write(f"   • {bus_number}: {date_stats[bus_number]} пассажиров\n")
+                report.write(f"Всего за день: {total_passengers_date} пассажиров\n\n")
             
-            text += f"Всего за день: {total_passengers_date} пассажиров\n\n"
-        
-        text += f"Общее количество пассажиров за период: {total_passengers_all}"
+            report.write(f"Общее количество пассажиров за период: {total_passengers_all}")
 
-        if len(text) > 4000:
-            file_data = text.encode('utf-8')
-            
-            file = BufferedInputFile(file_data, filename="table_data.txt")
-            
-            await message.answer_document(
-                file,
-                caption=f"📁 Данные таблицы ({len(records)} записей)."
-            )
-        else:
-            await send_message(message, text)
+            if report.length > 4000:
+                await message.answer_document(
+                    report.as_input_file("table_data.txt"),
+                    caption=f"📁 Данные таблицы ({records_count} записей)."
+                )
+            else:
+                await send_message(message, report.getvalue())
         
     except Exception as e:
         ConfigManager.log.logger.error(f"{e}\n❌ Ошибка при получении статистики с фильтрами")
         await send_message(message, "❌ **Произошла ошибка!** Не удалось получить статистику.")
 
+def _build_filter_params(data: dict) -> dict:
+    filter_params = {}
+    
+    date_filter_type = data.get("date_filter_type")
+    if date_filter_type == "specific":
+        filter_params["date_str"] = data.get("specific_date")
+    elif date_filter_type == "first_days":
+        filter_params["first_days_count"] = data.get("first_days_count")
+    elif date_filter_type == "last_days":
+        filter_params["last_days_count"] = data.get("last_days_count")
+    elif date_filter_type == "date_range":
+        filter_params["start_date_str"] = data.get("start_date")
+        filter_params["end_date_str"] = data.get("end_date")
+    
+    bus_filter = data.get("bus_filter")
+    if bus_filter == "specific":
+        filter_params["bus_numbers"] = data.get("bus_numbers")
+    
+    return filter_params
+
 def _build_stats_filters_text(data: dict) -> str:
     filters = []
     
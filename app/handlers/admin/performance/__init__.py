@@ -0,0 +1,6 @@
+from .show import router as show_router
+
+
+routers = [
+    show_router
+]
\ No newline at end of file
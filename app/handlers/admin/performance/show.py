@@ -0,0 +1,121 @@
+import time
+
+from aiogram import F, Router
+from aiogram.types import Message, CallbackQuery
+
+from core.managers import ConfigManager
+from core.managers import GoogleSheetsManager
+from core.managers import SheetsOutboxManager
+from core.managers import UserManager
+from core.database import SQLitePool
+from core.metrics import HandlerMetrics
+from utils.app import send_message, edit_message
+from ....keyboards.admin import performance_keyboard
+from ....filters import admin_filter
+
+
+router = Router()
+
+HANDLERS_LIMIT = 15
+QUERY_SHAPE_LIMIT = 300
+
+
+@router.message(F.text == "📊 Производительность", admin_filter())
+async def performance_settings(
+    message: Message,
+    user_manager: UserManager,
+    sheets_manager: GoogleSheetsManager,
+    outbox_manager: SheetsOutboxManager
+):
+    text = await build_performance_text(user_manager, sheets_manager, outbox_manager)
+    await send_message(message, text, reply_markup=performance_keyboard)
+
+@router.callback_query(F.data == "performance:show", admin_filter())
+async def cb_show_performance(
+    query: CallbackQuery,
+    user_manager: UserManager,
+    sheets_manager: GoogleSheetsManager,
+    outbox_manager: SheetsOutboxManager
+):
+    try:
+        text = await build_performance_text(user_manager, sheets_manager, outbox_manager)
+        await edit_message(query.message, text, reply_markup=performance_keyboard)
+    except Exception as e:
+        ConfigManager.log.logger.error(f"{e}\n❌ Ошибка при получении статистики производительности.")
+        await edit_message(query.message, "❌ Произошла ошибка при получении статистики производительности.")
+
+@router.callback_query(F.data == "performance:reset", admin_filter())
+async def cb_reset_performance(query: CallbackQuery):
+    HandlerMetrics().reset()
+    SQLitePool().profiler.reset()
+    ConfigManager.log.logger.info(f"Админ ID: {query.from_user.id} сбросил статистику производительности")
+    await edit_message(query.message, "✅ Статистика производительности сброшена.", reply_markup=performance_keyboard)
+
+@router.callback_query(F.data == "performance:queries", admin_filter())
+async def cb_show_slow_queries(query: CallbackQuery):
+    await edit_message(query.message, build_slow_queries_text(), reply_markup=performance_keyboard)
+
+def build_slow_queries_text() -> str:
+    profiler = SQLitePool().profiler
+    top = profiler.top()
+    if not top:
+        return "📭 Пока нет данных о запросах к базе."
+
+    rows = []
+    for stats in top:
+        shape = stats.shape if len(stats.shape) <= QUERY_SHAPE_LIMIT else stats.shape[:QUERY_SHAPE_LIMIT] + "…"
+        rows.append(
+            f"{shape}\n"
+            f"  вызовов {stats.count}, среднее {stats.mean_time * 1000:.1f} мс, макс {stats.max_time * 1000:.1f} мс, "
+            f"строк в среднем {stats.rows / stats.count:.1f}"
+        )
+    return (
+        f"🐢 **Самые медленные запросы к базе**\n"
+        f"Порог записи в лог: {profiler.slow_query_threshold * 1000:.0f} мс\n\n"
+        "```\n" + "\n\n".join(rows) + "\n```"
+    )
+
+async def build_performance_text(
+    user_manager: UserManager,
+    sheets_manager: GoogleSheetsManager,
+    outbox_manager: SheetsOutboxManager
+) -> str:
+    metrics = HandlerMetrics()
+    uptime_minutes = int(time.time() - metrics.started_at) // 60
+
+    lines = [
+        "📊 **Производительность обработчиков**",
+        f"За последние {uptime_minutes // 60} ч {uptime_minutes % 60} мин обработано обновлений: {metrics.updates_count}",
+        ""
+    ]
+
+    handlers = sorted(metrics.handlers.items(), key=lambda item: item[1].latency.sum, reverse=True)
+    if handlers:
+        rows = []
+        for (router_name, handler_name), stats in handlers[:HANDLERS_LIMIT]:
+            latency = stats.latency
+            name = "без обработчика" if handler_name == HandlerMetrics.UNHANDLED else f"{router_name}.{handler_name}"
+            rows.append(
+                f"{name}\n"
+                f"  вызовов {latency.count}, ошибок {stats.errors}\n"
+                f"  p50 {latency.quantile(0.5) * 1000:.0f} мс, p95 {latency.quantile(0.95) * 1000:.0f} мс, "
+                f"p99 {latency.quantile(0.99) * 1000:.0f} мс, макс {latency.max * 1000:.0f} мс\n"
+                f"  на вызов: БД {stats.calls['db'] / latency.count:.1f}, таблица {stats.calls['sheets'] / latency.count:.1f}"
+            )
+        lines.append("```\n" + "\n".join(rows) + "\n```")
+    else:
+        lines.append("📭 Пока нет данных.")
+
+    cache_stats = user_manager.get_cache_stats()
+    outbox_stats = await outbox_manager.get_stats()
+    executor_stats = sheets_manager.get_executor_stats()
+    quota_stats = sheets_manager.get_quota_stats()
+    lines += [
+        "",
+        f"👥 Кэш пользователей: {cache_stats['hit_ratio']:.0%} попаданий, {cache_stats['size']} из {cache_stats['max_size']}",
+        f"📤 Записей в очереди в гугл таблицу: {outbox_stats['pending']}",
+        f"📄 Запросов к таблице в ожидании: {executor_stats['queue_depth']}, "
+        f"скорость {quota_stats['rate_per_minute']:.0f} в минуту, ошибок квоты: {quota_stats['throttled']}"
+    ]
+
+    return "\n".join(lines)
@@ -3,6 +3,7 @@ from .edit import router as edit_user_router
 from .add import router as add_user_router
 from .delete import router as delete_user_router
 from .auto_lookup import router as auto_lookup_user_router
+from .stats import router as stats_user_router
 
 
 routers = [
@@ -10,5 +11,6 @@ routers = [
     edit_user_router,
     add_user_router,
     delete_user_router,
-    auto_lookup_user_router
+    auto_lookup_user_router,
+    stats_user_router
 ]
\ No newline at end of file
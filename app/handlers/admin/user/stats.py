@@ -0,0 +1,36 @@
+from aiogram import F, Router
+from aiogram.types import CallbackQuery
+
+from core.managers import UserManager, ConfigManager
+from utils.text.processing import translate_role
+from utils.app import edit_message
+from ....filters import admin_filter
+
+
+router = Router()
+
+@router.callback_query(F.data == "user:stats", admin_filter())
+async def cb_get_users_stats(query: CallbackQuery, user_manager: UserManager):
+    try:
+        users_stats = await user_manager.get_users_stats()
+        cache_stats = user_manager.get_cache_stats()
+    except Exception as e:
+        ConfigManager.log.logger.error(f"{e}\n❌ Произошла ошибка при получении статистики пользователей.")
+        await edit_message(query.message, "❌ Произошла ошибка! Не удалось получить статистику пользователей.")
+        return
+
+    roles_text = "\n".join(
+        f"• {translate_role(role)}: {count}" for role, count in sorted(users_stats["roles"].items())
+    ) or "• Нет пользователей"
+
+    await edit_message(
+        query.message,
+        f"📊 **Статистика пользователей**\n\n"
+        f"**Всего пользователей:** {users_stats['total_users']}\n"
+        f"{roles_text}\n\n"
+        f"🗂 **Кэш пользователей**\n"
+        f"**Записей в кэше:** {cache_stats['size']} из {cache_stats['max_size']}\n"
+        f"**Попадания:** {cache_stats['hits']}\n"
+        f"**Промахи:** {cache_stats['misses']}\n"
+        f"**Доля попаданий:** {cache_stats['hit_ratio']:.1%}"
+    )
\ No newline at end of file
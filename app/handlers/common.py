@@ -4,9 +4,9 @@ from aiogram.filters import CommandStart, Command
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
-from core.managers import UserManager
 from core.managers import BusStopsManager
 from core.managers import ConfigManager
+from core.models import User
 from utils.app import send_message, edit_message
 from ..keyboards import driver_main_keyboard, admin_main_keyboard
 from ..filters import ExistsFilter
@@ -15,15 +15,9 @@ from ..filters import ExistsFilter
 router = Router()
 
 @router.message(CommandStart(), ExistsFilter())
-async def cmd_start(message: Message, user_manager: UserManager):
-    user_id = message.from_user.id
-    
-    try:
-        role, name = await user_manager.get_parameters(user_id=user_id, get_role=True, get_name=True)
-    except Exception as e:
-        await send_message(message, f"❌ Произошла ошибка при получении данных.", None)
-        ConfigManager.log.logger.error(f"{e}\n❌ Произошла ошибка при получении данных в user_information у пользователя ID {user_id}.")
-        return
+async def cmd_start(message: Message, current_user: User):
+    role, name = current_user.role, current_user.name
+
     if role == "driver":
         await send_message(
             message, 
@@ -51,19 +45,13 @@ async def cmd_start(message: Message, user_manager: UserManager):
 
 @router.message(Command("my_details"), ExistsFilter())
 @router.message(F.text == "👤 Мои данные", ExistsFilter())
-async def user_information(message: Message, user_manager: UserManager, bus_stops_manager: BusStopsManager):
+async def user_information(message: Message, current_user: User, bus_stops_manager: BusStopsManager):
     user_id = message.from_user.id
+    role, name, bus_number = current_user.role, current_user.name, current_user.bus_number
     
     try:
-        role, name, bus_number = await user_manager.get_parameters(
-            user_id=user_id,
-            get_role=True, 
-            get_name=True, 
-            get_bus_number=True
-        )
-        stop_names = []
-        if bus_number and await bus_stops_manager.bus_exists(bus_number=bus_number):
-            stop_names = await bus_stops_manager.get_stops(bus_number=bus_number, get_stop_name=True)
+        route = bus_stops_manager.get_route(bus_number) if bus_number else None
+        stop_names = [stop.stop_name for stop in route or ()]
     except Exception as e:
         await send_message(message, f"❌ Произошла ошибка при получении данных.", None)
         ConfigManager.log.logger.error(f"{e}\n❌ Произошла ошибка при получении данных в user_information у пользователя ID {user_id}.")
@@ -102,15 +90,8 @@ async def user_information(message: Message, user_manager: UserManager, bus_stop
         ConfigManager.log.logger.critical(f"⚠️ У пользователя {name} не найдена роль {role}.")
 
 @router.message(Command("menu"), ExistsFilter())
-async def get_contact(message: Message, user_manager: UserManager):
-    user_id = message.from_user.id
-    
-    try:
-        role, name = await user_manager.get_parameters(user_id=user_id, get_role=True, get_name=True)
-    except Exception as e:
-        await send_message(message, f"❌ Произошла ошибка при получении данных.", None)
-        ConfigManager.log.logger.error(f"{e}\n❌ Произошла ошибка при получении данных в get_contact у пользователя ID {user_id}.")
-        return
+async def get_contact(message: Message, current_user: User):
+    role, name = current_user.role, current_user.name
 
     if role == "admin":
         await send_message(message, "Главное меню администратора:", reply_markup=admin_main_keyboard)
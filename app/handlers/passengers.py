@@ -2,10 +2,10 @@ from aiogram import F, Router
 from aiogram.types import Message, CallbackQuery
 from aiogram.filters import Command
 
-from core.managers import UserManager
 from core.managers import BusStopsManager
 from core.managers import ConfigManager
-from core.managers import GoogleSheetsManager
+from core.managers import RegistrationsManager
+from core.models import User
 from utils.app import send_message, edit_message
 from ..keyboards import get_stops_keyboard
 from ..filters import driver_filter
@@ -17,24 +17,18 @@ router = Router()
 @router.message(F.text == "🗑️ Удалить последнюю запись", driver_filter())
 async def delete_last_entry(
     message: Message,
-    sheets_manager: GoogleSheetsManager,
-    user_manager: UserManager
+    registrations_manager: RegistrationsManager,
+    current_user: User
 ):
     user_id = message.from_user.id
-
-    try:
-        driver_name = await user_manager.get_parameters(user_id=user_id, get_name=True)
-    except Exception as e:
-        await send_message(message, f"❌ Произошла ошибка при получении имени водителя.",)
-        ConfigManager.log.logger.error(f"{e}\n❌ Произошла ошибка при получении имени водителя для регистрации остановки ID {user_id}.")
+    driver_name = current_user.name
     
-    if not await sheets_manager.was_last_registration_today(driver_name):
+    if not await registrations_manager.was_last_registration_today(driver_name):
         await send_message(message, f"❗ Дальше вы уже не можете удалять записи", None)
         return
 
     try:
-
-        await sheets_manager.delete_nth_last_driver_entry(driver_name)
+        await registrations_manager.delete_nth_last_driver_entry(driver_name)
     except Exception as e:
         await send_message(message, f"❌ Произошла ошибка при удалении.")
         ConfigManager.log.logger.error(f"{e}\n❌ Произошла ошибка при удалении последней записи у водителя ID {user_id}.")
@@ -45,7 +39,7 @@ async def delete_last_entry(
 @router.message(F.text.func(lambda text: text and text.isdigit()), driver_filter())
 async def initiate_entry_with_count(
     message: Message, 
-    user_manager: UserManager,
+    current_user: User,
     bus_stops_manager: BusStopsManager,
 ):
     user_id = message.from_user.id
@@ -65,7 +59,7 @@ async def initiate_entry_with_count(
         return
     
     try:
-        bus_number = await user_manager.get_parameters(user_id=user_id, get_bus_number=True)
+        bus_number = current_user.bus_number
         
         if not bus_number:
             await send_message(
@@ -76,7 +70,8 @@ async def initiate_entry_with_count(
             ConfigManager.log.logger.warning(f"⚠️ У пользователя ID {user_id} не назначен автобус")
             return
         
-        if not await bus_stops_manager.bus_exists(bus_number=bus_number):
+        route = bus_stops_manager.get_route(bus_number)
+        if route is None:
             await send_message(
                 message,
                 f"❌ Автобус '{bus_number}' не существует в системе. Обратитесь к администратору.",
@@ -85,8 +80,7 @@ async def initiate_entry_with_count(
             ConfigManager.log.logger.error(f"⚠️ Автобус '{bus_number}' пользователя ID {user_id} не существует в системе")
             return
 
-        stops = await bus_stops_manager.get_stops(bus_number=bus_number, get_stop_id=True)
-        if not stops:
+        if not route:
             await send_message(
                 message,
                 f"❌ Для автобуса '{bus_number}' не назначены остановки. Обратитесь к администратору.",
@@ -109,8 +103,8 @@ async def initiate_entry_with_count(
             message,
             "🛑 Выберите остановку:",
             reply=True,
-            reply_markup=await get_stops_keyboard(
-                bus_number,
+            reply_markup=get_stops_keyboard(
+                route,
                 passenger_count
             )
         )
@@ -121,15 +115,18 @@ async def initiate_entry_with_count(
 @router.callback_query(F.data.startswith("register_passengers_"), driver_filter())
 async def confirm_and_save_registration(
     callback: CallbackQuery, 
-    user_manager: UserManager,
+    current_user: User,
     bus_stops_manager: BusStopsManager, 
-    sheets_manager: GoogleSheetsManager
+    registrations_manager: RegistrationsManager
 ):
     try:
         user_id = callback.from_user.id
         stop_id, passenger_count = map(int, callback.data.replace("register_passengers_", "").split("_"))
-        driver_name, bus_number = await user_manager.get_parameters(user_id=user_id, get_name=True, get_bus_number=True)
-        stop_name = await bus_stops_manager.get_stop(stop_id, get_stop_name=True)
+        driver_name, bus_number = current_user.name, current_user.bus_number
+        stop = bus_stops_manager.find_stop(stop_id)
+        if stop is None:
+            raise ValueError(f"Stop with stop_id={stop_id} not found.")
+        stop_name = stop.stop_name
     
     except Exception as e:
         await edit_message(callback.message, f"❌ Произошла ошибка. Остановка НЕ зарегистрирована. Попробуйте, пожалуйста, повторить ввод количества пассажиров.", None)
@@ -137,7 +134,7 @@ async def confirm_and_save_registration(
         return
 
     try:
-        await sheets_manager.add_row(
+        await registrations_manager.add_registration(
             driver_name,
             bus_number,
             stop_name,
@@ -145,7 +142,7 @@ async def confirm_and_save_registration(
         )
     except Exception as e:
         await edit_message(callback.message, f"❌ Произошла ошибка. Не удалось сохранить данные об остановке. Произошел сбой при регистрации. Пожалуйста, повторите попытку ввода количества пассажиров.", None)
-        ConfigManager.log.logger.error(f"{e}\n❌ Произошла ошибка при регистрации пассажиров у пользователя {driver_name}. Сбой при передаче/записи данных в таблицу.")
+        ConfigManager.log.logger.error(f"{e}\n❌ Произошла ошибка при регистрации пассажиров у пользователя {driver_name}. Сбой при записи данных в базу.")
         return
 
     await edit_message(
@@ -10,8 +10,10 @@ from .google_sheet import (
     confirm_delete_keyboard,
     sheets_stats_bus_filter_keyboard,
     sheets_stats_date_filter_keyboard,
-    sheets_settings_keyboard
+    sheets_settings_keyboard,
+    sheets_export_format_keyboard
 )
 from .bus import bus_settings_keyboard
 from .log import logs_settings_keyboard
+from .performance import performance_keyboard
 from .app_config import app_config_keyboard, get_app_config_set_keyboard
\ No newline at end of file
@@ -5,6 +5,8 @@ sheets_settings_keyboard = InlineKeyboardMarkup(inline_keyboard=[
     [InlineKeyboardButton(text="🗑 Удалить данные за первые N дней", callback_data="sheets:delete_data")],
     [InlineKeyboardButton(text="📊 Получить данные за последние N дней", callback_data="sheets:get_data")],
     [InlineKeyboardButton(text="📈 Получить статистику", callback_data="sheets:get_stats")],
+    [InlineKeyboardButton(text="📥 Экспорт данных (CSV/XLSX)", callback_data="sheets:export")],
+    [InlineKeyboardButton(text="🔄 Пересчитать статистику", callback_data="sheets:rebuild_rollups")],
     [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel")]
 ])
 
@@ -23,6 +25,13 @@ sheets_stats_bus_filter_keyboard = InlineKeyboardMarkup(inline_keyboard=[
     [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel")]
 ])
 
+sheets_export_format_keyboard = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="📄 CSV", callback_data="sheets:export_format:csv")],
+    [InlineKeyboardButton(text="🗜 CSV (gzip)", callback_data="sheets:export_format:csv_gz")],
+    [InlineKeyboardButton(text="📊 XLSX", callback_data="sheets:export_format:xlsx")],
+    [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel")]
+])
+
 confirm_delete_keyboard = InlineKeyboardMarkup(inline_keyboard=[
     [InlineKeyboardButton(text="✅ Да, удалить", callback_data="sheets:confirm_delete:yes")],
     [InlineKeyboardButton(text="❌ Отменить", callback_data="cancel")]
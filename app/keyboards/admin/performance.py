@@ -0,0 +1,9 @@
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+
+performance_keyboard = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="🔄 Обновить", callback_data="performance:show")],
+    [InlineKeyboardButton(text="🐢 Медленные запросы", callback_data="performance:queries")],
+    [InlineKeyboardButton(text="🧹 Сбросить статистику", callback_data="performance:reset")],
+    [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel")]
+])
@@ -7,6 +7,7 @@ user_settings_keyboard = InlineKeyboardMarkup(inline_keyboard=[
     [InlineKeyboardButton(text="✏️ Редактировать пользователя", callback_data="user:edit")],
     [InlineKeyboardButton(text="➕ Добавить пользователя", callback_data="user:add")],
     [InlineKeyboardButton(text="🗑️ Удалить пользователя", callback_data="user:delete")],
+    [InlineKeyboardButton(text="📊 Статистика пользователей", callback_data="user:stats")],
     [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel")]
 ])
 
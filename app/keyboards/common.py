@@ -1,7 +1,7 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
 
 from core.managers import ConfigManager
-from core.managers import BusStopsManager
+from core.models import Stop
 
 
 driver_main_keyboard = ReplyKeyboardMarkup(
@@ -19,21 +19,20 @@ admin_main_keyboard = ReplyKeyboardMarkup(
         [KeyboardButton(text="📄 Настройки гугл таблицы")],
         [KeyboardButton(text="🔑 Настройки логирования")],
         [KeyboardButton(text="📱 Настройки приложения")],
+        [KeyboardButton(text="📊 Производительность")],
         [KeyboardButton(text="👤 Мои данные")]
     ],
     resize_keyboard=True
 )
 
-async def get_stops_keyboard(bus_number: str, passenger_count: int) -> InlineKeyboardMarkup:
-    bus_stops_manager = await BusStopsManager.create()
-
+def get_stops_keyboard(route: tuple[Stop, ...], passenger_count: int) -> InlineKeyboardMarkup:
     stops = InlineKeyboardMarkup(inline_keyboard=[
         [
             InlineKeyboardButton(
-                text=stop_name, 
-                callback_data=f"register_passengers_{stop_id}_{passenger_count}"
+                text=stop.stop_name, 
+                callback_data=f"register_passengers_{stop.stop_id}_{passenger_count}"
             )
-        ] for stop_id, stop_name in await bus_stops_manager.get_stops(bus_number, get_stop_id=True, get_stop_name=True)
+        ] for stop in route
     ])
 
     return stops
\ No newline at end of file
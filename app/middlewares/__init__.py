@@ -0,0 +1,2 @@
+from .auth import AuthContextMiddleware
+from .metrics import MetricsMiddleware, HandlerNameMiddleware
\ No newline at end of file
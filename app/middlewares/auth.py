@@ -0,0 +1,30 @@
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, User as TelegramUser
+
+from core.managers import ConfigManager
+from core.managers import UserManager
+
+
+class AuthContextMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any]
+    ) -> Any:
+        event_from_user: TelegramUser | None = data.get("event_from_user")
+        user_manager: UserManager = data["user_manager"]
+
+        data["current_user"] = None
+        data["auth_error"] = False
+
+        if event_from_user is not None:
+            try:
+                data["current_user"] = await user_manager.get_user(user_id=event_from_user.id)
+            except Exception as e:
+                data["auth_error"] = True
+                ConfigManager.log.logger.error(f"{e}\n❌ Произошла ошибка при загрузке данных пользователя. ID пользователя: {event_from_user.id}")
+
+        return await handler(event, data)
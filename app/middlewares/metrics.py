@@ -0,0 +1,49 @@
+import time
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import TelegramObject
+
+from core.metrics import HandlerMetrics
+
+
+class MetricsMiddleware(BaseMiddleware):
+    # Registered as an outer middleware of updates, it times the whole update handling
+    def __init__(self, metrics: HandlerMetrics | None = None):
+        self.metrics = metrics or HandlerMetrics()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any]
+    ) -> Any:
+        context, token = self.metrics.start_update()
+        started_at = time.perf_counter()
+        failed = False
+        try:
+            return await handler(event, data)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.metrics.finish_update(context, token, time.perf_counter() - started_at, failed)
+
+
+class HandlerNameMiddleware(BaseMiddleware):
+    # Inner middlewares run after a handler was chosen, so the handler is known only here
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any]
+    ) -> Any:
+        context = HandlerMetrics.get_current_update()
+        handler_object: HandlerObject | None = data.get("handler")
+        if context is not None and handler_object is not None:
+            callback = handler_object.callback
+            context.router = getattr(callback, "__module__", "").removeprefix("app.handlers.")
+            context.handler = getattr(callback, "__name__", repr(callback))
+
+        return await handler(event, data)
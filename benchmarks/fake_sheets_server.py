@@ -0,0 +1,305 @@
+import argparse
+import asyncio
+import random
+import re
+import time
+from collections import Counter, deque
+from urllib.parse import unquote
+
+from aiohttp import web
+
+
+class FakeWorksheet:
+    def __init__(self, title: str, sheet_id: int, grid_rows: int):
+        self.title = title
+        self.sheet_id = sheet_id
+        self.grid_rows = grid_rows
+        self.rows: list[list[str]] = []
+
+    def get(self, start_row: int, start_col: int, end_col: int | None) -> list[list[str]]:
+        values = []
+        for row in self.rows[start_row - 1:]:
+            values.append(self._trim(row[start_col - 1:end_col]))
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def update(self, start_row: int, start_col: int, values: list[list]):
+        for offset, row in enumerate(values):
+            index = start_row - 1 + offset
+            while len(self.rows) <= index:
+                self.rows.append([])
+            target = self.rows[index]
+            while len(target) < start_col - 1 + len(row):
+                target.append("")
+            target[start_col - 1:start_col - 1 + len(row)] = [self._to_cell(cell) for cell in row]
+        self.grid_rows = max(self.grid_rows, len(self.rows))
+
+    def append(self, values: list[list]):
+        last_row = len(self.rows)
+        while last_row and not any(self.rows[last_row - 1]):
+            last_row -= 1
+        self.update(last_row + 1, 1, values)
+
+    def clear(self, start_row: int):
+        del self.rows[start_row - 1:]
+
+    def delete_rows(self, start_index: int, end_index: int):
+        del self.rows[start_index:end_index]
+        self.grid_rows = max(1, self.grid_rows - (end_index - start_index))
+
+    @staticmethod
+    def _to_cell(value) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, bool):
+            return str(value).upper()
+        return str(value)
+
+    @staticmethod
+    def _trim(row: list[str]) -> list[str]:
+        row = list(row)
+        while row and row[-1] == "":
+            row.pop()
+        return row
+
+
+class FakeSheetsServer:
+    # In-memory stand-in for the Sheets v4 endpoints used by core/sheets SheetsClient
+    CELLS_PATTERN = re.compile(r"^([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$")
+
+    def __init__(
+            self,
+            sheet_title: str = "Sheet1",
+            grid_rows: int = 1000,
+            latency_ms: float = 0,
+            jitter_ms: float = 0,
+            requests_per_minute: int | None = None,
+            error_rate: float = 0
+        ):
+        self.sheet_title = sheet_title
+        self.grid_rows = grid_rows
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.requests_per_minute = requests_per_minute
+        self.error_rate = error_rate
+
+        self.spreadsheets: dict[str, dict[str, FakeWorksheet]] = {}
+        self.calls: Counter[str] = Counter()
+        self._request_times: deque[float] = deque()
+        self._runner: web.AppRunner | None = None
+        self.url: str | None = None
+
+    def get_worksheet(self, spreadsheet_id: str, title: str | None = None) -> FakeWorksheet:
+        # Every spreadsheet id exists and has one worksheet with the configured title
+        worksheets = self.spreadsheets.setdefault(spreadsheet_id, {})
+        if not worksheets:
+            worksheets[self.sheet_title] = FakeWorksheet(self.sheet_title, 0, self.grid_rows)
+
+        title = title or next(iter(worksheets))
+        if title not in worksheets:
+            raise ValueError(f"Unable to parse range: {title}")
+        return worksheets[title]
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/_stats", self._handle_stats)
+        app.router.add_route("*", "/v4/spreadsheets/{path:.*}", self._handle)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._runner = web.AppRunner(self.create_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}/v4"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "calls": dict(self.calls),
+            "rows": {
+                spreadsheet_id: {title: len(sheet.rows) for title, sheet in worksheets.items()}
+                for spreadsheet_id, worksheets in self.spreadsheets.items()
+            }
+        })
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        path = unquote(request.match_info["path"])
+        spreadsheet_id, _, rest = path.partition("/")
+        operation, handler, args = self._route(request.method, spreadsheet_id, rest)
+        self.calls[operation] += 1
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+
+        if self._is_throttled():
+            self.calls["throttled"] += 1
+            return self._error(429, "Quota exceeded for quota metric 'Requests per minute per user'", retry_after=1)
+        if self.error_rate and random.random() < self.error_rate:
+            self.calls["failed"] += 1
+            return self._error(503, "The service is currently unavailable.")
+
+        try:
+            return await handler(request, *args)
+        except ValueError as e:
+            return self._error(400, str(e))
+
+    def _route(self, method: str, spreadsheet_id: str, rest: str):
+        if spreadsheet_id.endswith(":batchUpdate"):
+            return "batch_update", self._batch_update, (spreadsheet_id.removesuffix(":batchUpdate"),)
+        if not rest:
+            return "metadata", self._metadata, (spreadsheet_id,)
+
+        range_name = rest.removeprefix("values/")
+        if range_name.endswith(":append"):
+            return "append", self._append, (spreadsheet_id, range_name.removesuffix(":append"))
+        if range_name.endswith(":clear"):
+            return "clear", self._clear, (spreadsheet_id, range_name.removesuffix(":clear"))
+        if method == "PUT":
+            return "update", self._update, (spreadsheet_id, range_name)
+        return "get", self._get, (spreadsheet_id, range_name)
+
+    async def _metadata(self, request: web.Request, spreadsheet_id: str) -> web.Response:
+        self.get_worksheet(spreadsheet_id)
+        return web.json_response({
+            "spreadsheetId": spreadsheet_id,
+            "sheets": [
+                {"properties": {
+                    "sheetId": sheet.sheet_id,
+                    "title": sheet.title,
+                    "gridProperties": {"rowCount": sheet.grid_rows, "columnCount": 26}
+                }}
+                for sheet in self.spreadsheets[spreadsheet_id].values()
+            ]
+        })
+
+    async def _get(self, request: web.Request, spreadsheet_id: str, range_name: str) -> web.Response:
+        sheet, start_row, start_col, end_col = self._parse_range(spreadsheet_id, range_name)
+        if start_row > sheet.grid_rows:
+            raise ValueError(f"Range ({range_name}) exceeds grid limits. Max rows: {sheet.grid_rows}, max columns: 26")
+
+        values = sheet.get(start_row, start_col, end_col)
+        response = {"range": range_name, "majorDimension": "ROWS"}
+        if values:
+            response["values"] = values
+        return web.json_response(response)
+
+    async def _append(self, request: web.Request, spreadsheet_id: str, range_name: str) -> web.Response:
+        sheet, *_ = self._parse_range(spreadsheet_id, range_name)
+        values = (await request.json()).get("values", [])
+        sheet.append(values)
+        return web.json_response({"spreadsheetId": spreadsheet_id, "updates": {"updatedRows": len(values)}})
+
+    async def _update(self, request: web.Request, spreadsheet_id: str, range_name: str) -> web.Response:
+        sheet, start_row, start_col, _ = self._parse_range(spreadsheet_id, range_name)
+        values = (await request.json()).get("values", [])
+        sheet.update(start_row, start_col, values)
+        return web.json_response({"spreadsheetId": spreadsheet_id, "updatedRows": len(values)})
+
+    async def _clear(self, request: web.Request, spreadsheet_id: str, range_name: str) -> web.Response:
+        sheet, start_row, *_ = self._parse_range(spreadsheet_id, range_name)
+        sheet.clear(start_row)
+        return web.json_response({"spreadsheetId": spreadsheet_id, "clearedRange": range_name})
+
+    async def _batch_update(self, request: web.Request, spreadsheet_id: str) -> web.Response:
+        worksheets = self.spreadsheets.get(spreadsheet_id, {})
+        for item in (await request.json()).get("requests", []):
+            dimension_range = item.get("deleteDimension", {}).get("range")
+            if dimension_range is None or dimension_range.get("dimension") != "ROWS":
+                raise ValueError(f"Unsupported batchUpdate request: {list(item)}")
+
+            sheet = next((s for s in worksheets.values() if s.sheet_id == dimension_range["sheetId"]), None)
+            if sheet is None:
+                raise ValueError(f"No grid with id: {dimension_range['sheetId']}")
+            sheet.delete_rows(dimension_range["startIndex"], dimension_range["endIndex"])
+
+        return web.json_response({"spreadsheetId": spreadsheet_id, "replies": [{}]})
+
+    def _parse_range(self, spreadsheet_id: str, range_name: str) -> tuple[FakeWorksheet, int, int, int | None]:
+        title, separator, cells = range_name.rpartition("!")
+        if not separator:
+            # A range is either a bare sheet title or cells of the first sheet
+            title, cells = (None, range_name) if self.CELLS_PATTERN.match(range_name) else (range_name, "")
+        if title and title.startswith("'") and title.endswith("'"):
+            title = title[1:-1].replace("''", "'")
+
+        match = self.CELLS_PATTERN.match(cells)
+        if match is None:
+            raise ValueError(f"Unable to parse range: {range_name}")
+
+        start_col, start_row, end_col, _ = match.groups()
+        return (
+            self.get_worksheet(spreadsheet_id, title),
+            int(start_row) if start_row else 1,
+            self._column_index(start_col) if start_col else 1,
+            self._column_index(end_col) if end_col else None
+        )
+
+    @staticmethod
+    def _column_index(letters: str) -> int:
+        index = 0
+        for letter in letters:
+            index = index * 26 + ord(letter) - ord("A") + 1
+        return index
+
+    def _is_throttled(self) -> bool:
+        if not self.requests_per_minute:
+            return False
+
+        now = time.monotonic()
+        while self._request_times and now - self._request_times[0] >= 60:
+            self._request_times.popleft()
+        if len(self._request_times) >= self.requests_per_minute:
+            return True
+        self._request_times.append(now)
+        return False
+
+    @staticmethod
+    def _error(code: int, message: str, retry_after: int | None = None) -> web.Response:
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+        return web.json_response({"error": {"code": code, "message": message}}, status=code, headers=headers)
+
+
+async def serve(args: argparse.Namespace):
+    server = FakeSheetsServer(
+        sheet_title=args.sheet_title,
+        grid_rows=args.grid_rows,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        requests_per_minute=args.requests_per_minute,
+        error_rate=args.error_rate
+    )
+    url = await server.start(args.host, args.port)
+    print(f"Fake Google Sheets API: {url} (statistics: {url.removesuffix('/v4')}/_stats)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Google Sheets v4 API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--sheet-title", default="Sheet1")
+    parser.add_argument("--grid-rows", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra delay up to this value")
+    parser.add_argument("--requests-per-minute", type=int, default=None, help="Answer 429 above this rate")
+    parser.add_argument("--error-rate", type=float, default=0, help="Share of requests answered with 503")
+
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
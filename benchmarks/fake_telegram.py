@@ -0,0 +1,75 @@
+import itertools
+import time
+import typing
+from collections import Counter
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import Message, Update
+
+
+class FakeBotSession(BaseSession):
+    # Answers Bot API calls in process, without network, so only the bot's own work is measured
+    def __init__(self):
+        super().__init__()
+        self.calls: Counter[str] = Counter()
+        self._message_ids = itertools.count(1)
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: int | None = None):
+        self.calls[type(method).__name__] += 1
+
+        returning = method.__returning__
+        if Message in (typing.get_args(returning) or (returning,)):
+            return Message.model_validate(
+                {
+                    "message_id": next(self._message_ids),
+                    "date": int(time.time()),
+                    "chat": {"id": getattr(method, "chat_id", None) or 1, "type": "private"},
+                    "text": getattr(method, "text", None) or getattr(method, "caption", None) or ""
+                },
+                context={"bot": bot}
+            )
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+class UpdateFactory:
+    def __init__(self):
+        self._update_ids = itertools.count(1)
+
+    def message(self, user_id: int, text: str) -> Update:
+        update_id = next(self._update_ids)
+        return Update.model_validate({
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+                "text": text
+            }
+        })
+
+    def callback(self, user_id: int, data: str) -> Update:
+        update_id = next(self._update_ids)
+        return Update.model_validate({
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id),
+                "chat_instance": str(user_id),
+                "data": data,
+                "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+                "message": {
+                    "message_id": update_id,
+                    "date": int(time.time()),
+                    "chat": {"id": user_id, "type": "private"},
+                    "text": "-"
+                }
+            }
+        })
@@ -0,0 +1,254 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+REPO_PATH = Path(__file__).resolve().parents[1]
+if str(REPO_PATH) not in sys.path:
+    sys.path.insert(0, str(REPO_PATH))
+
+from benchmarks.fake_sheets_server import FakeSheetsServer
+from benchmarks.fake_telegram import FakeBotSession, UpdateFactory
+
+
+SHEET_ID = "load-test"
+SHEET_TITLE = "Лист1"
+
+
+class QueryCounter:
+    # The trace callback is called from the aiosqlite threads
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, statement: str):
+        with self._lock:
+            self.count += 1
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.updates = UpdateFactory()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def run(self) -> dict:
+        # Imported here because the core modules create configs/ and data/ in the working directory on import
+        from main import build_dispatcher, close_dispatcher
+        from aiogram import Bot
+        from core.database import SQLitePool
+        from core.sheets import SheetsClient
+
+        server = FakeSheetsServer(
+            sheet_title=SHEET_TITLE,
+            latency_ms=self.args.sheets_latency_ms,
+            jitter_ms=self.args.sheets_jitter_ms,
+            requests_per_minute=self.args.sheets_requests_per_minute
+        )
+        sheets_url = await server.start()
+
+        dp = await build_dispatcher(SheetsClient(SHEET_ID, None, base_url=sheets_url))
+        self.dp = dp
+        self.session = FakeBotSession()
+        self.bot = Bot("42:LOAD_TEST", session=self.session)
+        try:
+            drivers, admins = await self._seed(dp)
+
+            queries = QueryCounter()
+            await SQLitePool().set_trace_callback(queries)
+            server.calls.clear()
+            self.session.calls.clear()
+
+            started_at = time.perf_counter()
+            await asyncio.gather(
+                *(self._driver_flow(user_id, route) for user_id, route in drivers),
+                *(self._admin_flow(user_id) for user_id in admins)
+            )
+            duration = time.perf_counter() - started_at
+            await SQLitePool().set_trace_callback(None)
+
+            # The outbox starts only now, so its own queries are not counted as queries made by updates
+            drain_started_at = time.perf_counter()
+            dp["outbox_manager"].start()
+            await self._wait_outbox_drained(dp["outbox_manager"])
+            drain_duration = time.perf_counter() - drain_started_at
+
+            return self._build_report(duration, drain_duration, queries.count, dict(server.calls))
+        finally:
+            await close_dispatcher(dp)
+            await server.stop()
+
+    async def _seed(self, dp) -> tuple[list, list[int]]:
+        user_manager = dp["user_manager"]
+        bus_stops_manager = dp["bus_stops_manager"]
+
+        for bus_index in range(self.args.buses):
+            bus_number = str(100 + bus_index)
+            await bus_stops_manager.create_bus(bus_number)
+            for stop_index in range(self.args.stops):
+                await bus_stops_manager.create_stop(bus_number=bus_number, stop_name=f"Остановка {bus_index}-{stop_index}")
+
+        drivers = []
+        for i in range(self.args.drivers):
+            user_id = 1_000_000 + i
+            bus_number = str(100 + i % self.args.buses)
+            await user_manager.create_user(f"99655{user_id:07d}", "driver", f"Водитель {i}", bus_number, user_id)
+            drivers.append((user_id, bus_stops_manager.get_route(bus_number)))
+
+        admins = []
+        for i in range(self.args.admins):
+            user_id = 2_000_000 + i
+            await user_manager.create_user(f"99677{user_id:07d}", "admin", f"Админ {i}", user_id=user_id)
+            admins.append(user_id)
+
+        return drivers, admins
+
+    async def _driver_flow(self, user_id: int, route):
+        for _ in range(self.args.rounds):
+            passenger_count = self.random.randint(0, 30)
+            stop = self.random.choice(route)
+            await self._feed("driver_count_message", self.updates.message(user_id, str(passenger_count)))
+            await self._feed(
+                "driver_register_callback",
+                self.updates.callback(user_id, f"register_passengers_{stop.stop_id}_{passenger_count}")
+            )
+            if self.random.random() < self.args.undo_rate:
+                await self._feed("driver_undo", self.updates.message(user_id, "🗑️ Удалить последнюю запись"))
+
+    async def _admin_flow(self, user_id: int):
+        for _ in range(self.args.admin_rounds):
+            await self._feed("admin_stats", self.updates.callback(user_id, "sheets:get_stats"))
+            await self._feed("admin_stats", self.updates.callback(user_id, "sheets:stats_date_filter:all"))
+            await self._feed("admin_stats", self.updates.callback(user_id, "sheets:stats_bus_filter:all"))
+            await self._feed("admin_get_data", self.updates.callback(user_id, "sheets:get_data"))
+            await self._feed("admin_get_data", self.updates.message(user_id, "7"))
+
+    async def _feed(self, kind: str, update):
+        if self.args.think_ms:
+            await asyncio.sleep(self.random.uniform(0, self.args.think_ms) / 1000)
+
+        started_at = time.perf_counter()
+        try:
+            await self.dp.feed_update(self.bot, update)
+        except Exception:
+            self.errors[kind] += 1
+        self.latencies[kind].append(time.perf_counter() - started_at)
+
+    async def _wait_outbox_drained(self, outbox_manager, timeout: float = 120):
+        deadline = time.monotonic() + timeout
+        while (await outbox_manager.get_stats())["pending"] and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+    def _build_report(self, duration: float, drain_duration: float, queries_count: int, sheets_calls: dict) -> dict:
+        all_latencies = [value for values in self.latencies.values() for value in values]
+        updates_count = len(all_latencies)
+        sheets_requests = sum(count for name, count in sheets_calls.items() if name not in ("throttled", "failed"))
+
+        return {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "parameters": vars(self.args),
+            "updates": updates_count,
+            "duration_s": round(duration, 3),
+            "updates_per_s": round(updates_count / duration, 1) if duration else 0.0,
+            "outbox_drain_s": round(drain_duration, 3),
+            "latency_ms": {
+                "all": summarize(all_latencies),
+                **{kind: summarize(values) for kind, values in sorted(self.latencies.items())}
+            },
+            "errors": dict(self.errors),
+            "db_queries": queries_count,
+            "db_queries_per_update": round(queries_count / updates_count, 2) if updates_count else 0.0,
+            "sheets_calls": sheets_calls,
+            "sheets_calls_per_update": round(sheets_requests / updates_count, 3) if updates_count else 0.0,
+            "telegram_calls": dict(self.session.calls)
+        }
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values) * 1000, 3),
+        "p50": round(percentile(values, 50) * 1000, 3),
+        "p95": round(percentile(values, 95) * 1000, 3),
+        "p99": round(percentile(values, 99) * 1000, 3),
+        "max": round(values[-1] * 1000, 3)
+    }
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    index = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def prepare_workdir(workdir: str | None) -> Path:
+    path = Path(workdir) if workdir else Path(tempfile.mkdtemp(prefix="route_tracker_load_"))
+    (path / "configs").mkdir(parents=True, exist_ok=True)
+    app_config_path = path / "configs" / "app.json"
+    if not app_config_path.exists():
+        shutil.copyfile(REPO_PATH / "configs" / "app.json", app_config_path)
+    (path / "configs" / ".env").write_text(
+        f"TELEGRAM_BOT_TOKEN=42:LOAD_TEST\nGOOGLE_SHEET_NAME={SHEET_TITLE}\nGOOGLE_SHEET_ID={SHEET_ID}\n",
+        encoding="utf-8"
+    )
+    return path
+
+
+def print_report(report: dict):
+    print(f"Обновлений: {report['updates']} за {report['duration_s']} с ({report['updates_per_s']} в секунду)")
+    for kind, stats in report["latency_ms"].items():
+        if stats:
+            print(f"  {kind:<26} p50 {stats['p50']:>9.2f} мс  p95 {stats['p95']:>9.2f} мс  p99 {stats['p99']:>9.2f} мс")
+    print(f"Запросов к базе на обновление: {report['db_queries_per_update']}")
+    print(f"Запросов к Google таблице на обновление: {report['sheets_calls_per_update']}")
+    print(f"Очередь записей в таблицу разобрана за {report['outbox_drain_s']} с")
+    if report["errors"]:
+        print(f"Ошибки: {report['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of the bot with fake Telegram Bot API and Google Sheets")
+    parser.add_argument("--drivers", type=int, default=50)
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--buses", type=int, default=5)
+    parser.add_argument("--stops", type=int, default=10, help="Stops per bus")
+    parser.add_argument("--rounds", type=int, default=20, help="Registrations per driver")
+    parser.add_argument("--admin-rounds", type=int, default=5, help="Stats and data requests per admin")
+    parser.add_argument("--undo-rate", type=float, default=0.05, help="Share of registrations followed by an undo")
+    parser.add_argument("--think-ms", type=float, default=0, help="Random pause up to this value before each update")
+    parser.add_argument("--sheets-latency-ms", type=float, default=100)
+    parser.add_argument("--sheets-jitter-ms", type=float, default=50)
+    parser.add_argument("--sheets-requests-per-minute", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workdir", default=None, help="Directory for configs/ and data/, a temporary one by default")
+    parser.add_argument("--output", default="load_test_results.json")
+    args = parser.parse_args()
+
+    output_path = Path(args.output).resolve()
+    workdir = prepare_workdir(args.workdir)
+    os.chdir(workdir)
+
+    report = asyncio.run(LoadTest(args).run())
+    report["workdir"] = str(workdir)
+    output_path.write_text(json.dumps(report, ensure_ascii=False, indent=4), encoding="utf-8")
+
+    print_report(report)
+    print(f"Результаты сохранены в {output_path}")
+
+
+if __name__ == "__main__":
+    main()
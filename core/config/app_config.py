@@ -4,4 +4,24 @@ from .key_value_base import KeyValueBase
 
 class AppConfig(KeyValueBase):
     config_path = app_config_path
-    keys = {"time_zone": str, "min_passenger_count": int, "max_passenger_count": int}
\ No newline at end of file
+    keys = {
+        "time_zone": str,
+        "min_passenger_count": int,
+        "max_passenger_count": int,
+        "db_readers_count": int,
+        "user_cache_size": int,
+        "sheets_batch_size": int,
+        "sheets_batch_latency_ms": int,
+        "sheets_queue_size": int,
+        "sheets_retry_base_delay_ms": int,
+        "sheets_retry_max_delay_ms": int,
+        "sheets_reconcile_interval_s": int,
+        "sheets_snapshot_ttl_ms": int,
+        "sheets_executor_workers": int,
+        "sheets_requests_per_minute": int,
+        "sheets_requests_burst": int,
+        "metrics_port": int,
+        "metrics_host": str,
+        "db_slow_query_ms": int,
+        "db_profiler_top_size": int
+    }
\ No newline at end of file
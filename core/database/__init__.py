@@ -0,0 +1,2 @@
+from .sqlite_pool import SQLitePool
+from .query_profiler import QueryProfiler, QueryShapeStats
@@ -0,0 +1,198 @@
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+import aiosqlite
+
+
+@dataclass
+class QueryShapeStats:
+    shape: str
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    rows: int = 0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+
+class QueryProfiler:
+    DEFAULT_SLOW_QUERY_MS = 100
+    DEFAULT_TOP_SIZE = 10
+    MAX_SHAPES = 500
+
+    _STRING_RE = re.compile(r"'(?:[^']|'')*'")
+    _NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+    _IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+    _SPACE_RE = re.compile(r"\s+")
+
+    def __init__(
+            self,
+            slow_query_ms: float = DEFAULT_SLOW_QUERY_MS,
+            top_size: int = DEFAULT_TOP_SIZE,
+            on_slow_query: Callable[[str], None] | None = None
+        ):
+        self.slow_query_threshold = slow_query_ms / 1000
+        self.top_size = top_size
+        self.on_slow_query = on_slow_query
+        self.shapes: dict[str, QueryShapeStats] = {}
+        self._normalized: dict[str, str] = {}
+
+    def normalize(self, sql: str) -> str:
+        # Managers send the same few SQL strings over and over, so normalized shapes are memoized
+        shape = self._normalized.get(sql)
+        if shape is None:
+            shape = self._STRING_RE.sub("?", sql)
+            shape = self._NUMBER_RE.sub("?", shape)
+            shape = self._SPACE_RE.sub(" ", shape).strip().rstrip(";")
+            # IN (?, ?, ?) lists of any length are one shape
+            shape = self._IN_LIST_RE.sub("(...)", shape)
+            if len(self._normalized) < self.MAX_SHAPES * 4:
+                self._normalized[sql] = shape
+        return shape
+
+    async def record(
+            self,
+            connect: aiosqlite.Connection,
+            sql: str,
+            parameters: Any,
+            duration: float,
+            rows: int
+        ):
+        # sqlite reports -1 rows for statements without a row count
+        rows = max(rows, 0)
+        shape = self.normalize(sql)
+        stats = self.shapes.get(shape)
+        if stats is None:
+            if len(self.shapes) >= self.MAX_SHAPES:
+                return
+            stats = self.shapes[shape] = QueryShapeStats(shape)
+
+        stats.count += 1
+        stats.total_time += duration
+        stats.rows += rows
+        if duration > stats.max_time:
+            stats.max_time = duration
+
+        if duration >= self.slow_query_threshold and self.on_slow_query is not None:
+            plan = await self.explain(connect, sql, parameters)
+            self.on_slow_query(
+                f"🐢 Медленный запрос к базе: {duration * 1000:.1f} мс, строк: {rows}\n"
+                f"{shape}\n"
+                f"План запроса:\n{plan}"
+            )
+
+    async def explain(self, connect: aiosqlite.Connection, sql: str, parameters: Any) -> str:
+        try:
+            async with connect.execute(f"EXPLAIN QUERY PLAN {sql}", parameters or ()) as cursor:
+                plan_rows = await cursor.fetchall()
+        except Exception as e:
+            return f"недоступен ({e})"
+
+        # Rows are (id, parent, notused, detail), children are indented under their parent
+        depths = {0: 0}
+        lines = []
+        for node_id, parent_id, _, detail in plan_rows:
+            depths[node_id] = depths.get(parent_id, 0) + 1
+            lines.append("  " * depths[node_id] + detail)
+        return "\n".join(lines) or "пустой"
+
+    def top(self, size: int | None = None, key: str = "max_time") -> list[QueryShapeStats]:
+        return sorted(self.shapes.values(), key=lambda stats: getattr(stats, key), reverse=True)[:size or self.top_size]
+
+    def reset(self):
+        self.shapes.clear()
+
+
+class ProfiledCursor:
+    # Counts the rows and the time spent fetching them, the query is recorded when the cursor is closed
+    def __init__(self, cursor: aiosqlite.Cursor):
+        self._cursor = cursor
+        self.rows = 0
+        self.fetch_time = 0.0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+    async def fetchone(self):
+        started_at = time.perf_counter()
+        row = await self._cursor.fetchone()
+        self.fetch_time += time.perf_counter() - started_at
+        self.rows += row is not None
+        return row
+
+    async def fetchmany(self, size: int | None = None):
+        started_at = time.perf_counter()
+        rows = await (self._cursor.fetchmany(size) if size is not None else self._cursor.fetchmany())
+        self.fetch_time += time.perf_counter() - started_at
+        self.rows += len(rows)
+        return rows
+
+    async def fetchall(self):
+        started_at = time.perf_counter()
+        rows = await self._cursor.fetchall()
+        self.fetch_time += time.perf_counter() - started_at
+        self.rows += len(rows)
+        return rows
+
+    async def __aiter__(self):
+        while rows := await self.fetchmany():
+            for row in rows:
+                yield row
+
+
+class ProfiledQuery:
+    # Like the result of aiosqlite execute(): can be awaited or used with "async with"
+    def __init__(self, connect: "ProfiledConnection", sql: str, parameters: Any):
+        self._connect = connect
+        self._sql = sql
+        self._parameters = parameters
+        self._cursor: ProfiledCursor | None = None
+        self._duration = 0.0
+
+    def __await__(self):
+        return self._execute_and_record().__await__()
+
+    async def __aenter__(self) -> ProfiledCursor:
+        self._cursor = ProfiledCursor(await self._execute())
+        return self._cursor
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._cursor.close()
+        rows = self._cursor.rows or self._cursor.rowcount
+        await self._connect.record(self._sql, self._parameters, self._duration + self._cursor.fetch_time, rows)
+
+    async def _execute(self) -> aiosqlite.Cursor:
+        started_at = time.perf_counter()
+        cursor = await self._connect.connection.execute(self._sql, self._parameters)
+        self._duration = time.perf_counter() - started_at
+        return cursor
+
+    async def _execute_and_record(self) -> aiosqlite.Cursor:
+        cursor = await self._execute()
+        await self._connect.record(self._sql, self._parameters, self._duration, cursor.rowcount)
+        return cursor
+
+
+class ProfiledConnection:
+    def __init__(self, connection: aiosqlite.Connection, profiler: QueryProfiler):
+        self.connection = connection
+        self.profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.connection, name)
+
+    def execute(self, sql: str, parameters: Iterable[Any] | None = None) -> ProfiledQuery:
+        return ProfiledQuery(self, sql, parameters)
+
+    async def executemany(self, sql: str, parameters: Iterable[Iterable[Any]]) -> aiosqlite.Cursor:
+        started_at = time.perf_counter()
+        cursor = await self.connection.executemany(sql, parameters)
+        await self.record(sql, None, time.perf_counter() - started_at, cursor.rowcount)
+        return cursor
+
+    async def record(self, sql: str, parameters: Any, duration: float, rows: int):
+        await self.profiler.record(self.connection, sql, parameters, duration, rows)
@@ -0,0 +1,120 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Callable
+
+import aiosqlite
+
+from ..config import data_path, AppConfig, LoggingManager
+from ..metrics import Histogram, count_call
+from .query_profiler import QueryProfiler, ProfiledConnection
+
+
+class SQLitePool:
+    _instance: "SQLitePool" = None
+    _initialized = False
+
+    DEFAULT_READERS_COUNT = 4
+    PRAGMAS = (
+        "PRAGMA foreign_keys = ON;",
+        "PRAGMA busy_timeout = 5000;",
+    )
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @classmethod
+    async def create(cls, path: Path = data_path, readers_count: int | None = None):
+        if not cls._initialized:
+            cls._instance = cls()
+            await cls._instance.open(path, readers_count or cls.DEFAULT_READERS_COUNT)
+            cls._initialized = True
+
+        return cls._instance
+
+    async def open(self, path: Path, readers_count: int):
+        if readers_count <= 0:
+            raise ValueError("Readers count must be a positive integer.")
+
+        # Time spent waiting for a connection and holding it, per connection kind
+        self.timings = {
+            "read_wait": Histogram(),
+            "read": Histogram(),
+            "write_wait": Histogram(),
+            "write": Histogram()
+        }
+        config = AppConfig()
+        self.profiler = QueryProfiler(
+            config.get("db_slow_query_ms", QueryProfiler.DEFAULT_SLOW_QUERY_MS),
+            config.get("db_profiler_top_size", QueryProfiler.DEFAULT_TOP_SIZE),
+            LoggingManager().logger.warning
+        )
+
+        self._writer = await self._connect(path)
+        await self._writer.execute("PRAGMA journal_mode = WAL;")
+        self._write_lock = asyncio.Lock()
+
+        self._readers: list[ProfiledConnection] = []
+        self._free_readers: asyncio.Queue[ProfiledConnection] = asyncio.Queue()
+        for _ in range(readers_count):
+            reader = await self._connect(path)
+            self._readers.append(reader)
+            self._free_readers.put_nowait(reader)
+
+    async def close(self):
+        cls = type(self)
+        if not cls._initialized:
+            return
+
+        cls._initialized = False
+        for connect in (self._writer, *self._readers):
+            await connect.close()
+
+    async def set_trace_callback(self, callback: Callable[[str], None] | None):
+        self._ensure_opened()
+        for connect in (self._writer, *self._readers):
+            await connect.set_trace_callback(callback)
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[ProfiledConnection]:
+        self._ensure_opened()
+        count_call("db")
+        requested_at = time.perf_counter()
+        connect = await self._free_readers.get()
+        acquired_at = time.perf_counter()
+        self.timings["read_wait"].observe(acquired_at - requested_at)
+        try:
+            yield connect
+        finally:
+            self._free_readers.put_nowait(connect)
+            self.timings["read"].observe(time.perf_counter() - acquired_at)
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[ProfiledConnection]:
+        self._ensure_opened()
+        count_call("db")
+        requested_at = time.perf_counter()
+        async with self._write_lock:
+            acquired_at = time.perf_counter()
+            self.timings["write_wait"].observe(acquired_at - requested_at)
+            try:
+                yield self._writer
+            except BaseException:
+                if self._writer.in_transaction:
+                    await self._writer.rollback()
+                raise
+            finally:
+                self.timings["write"].observe(time.perf_counter() - acquired_at)
+
+    async def _connect(self, path: Path) -> ProfiledConnection:
+        connect = await aiosqlite.connect(path)
+        for pragma in self.PRAGMAS:
+            await connect.execute(pragma)
+        return ProfiledConnection(connect, self.profiler)
+
+    def _ensure_opened(self):
+        if not type(self)._initialized:
+            raise RuntimeError("SQLitePool is not opened. Call SQLitePool.create() first")
@@ -1,4 +1,6 @@
 from .user_manager import UserManager
 from .bus_stops_manager import BusStopsManager
 from .config_manager import ConfigManager
-from .google_sheets_manager import GoogleSheetsManager
\ No newline at end of file
+from .google_sheets_manager import GoogleSheetsManager
+from .registrations_manager import RegistrationsManager
+from .sheets_outbox_manager import SheetsOutboxManager
\ No newline at end of file
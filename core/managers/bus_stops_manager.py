@@ -1,7 +1,8 @@
-import aiosqlite
 from typing import Any
 
-from ..config import data_path
+from .config_manager import ConfigManager
+from ..database import SQLitePool
+from ..models import RouteCatalog, Stop
 from utils.text.processing import validate_bus_number, validate_stop_name
 
 
@@ -18,15 +19,18 @@ class BusStopsManager:
     async def create(cls):
         if not cls._initialized:
             cls._instance = cls()
+            cls._instance.pool = await SQLitePool.create(
+                readers_count=ConfigManager.app.get("db_readers_count", SQLitePool.DEFAULT_READERS_COUNT)
+            )
             await cls._instance.create_table()
+            async with cls._instance.pool.reader() as connect:
+                await cls._instance._reload_catalog(connect)
             cls._initialized = True
         
         return cls._instance
 
     async def create_table(self):
-        async with aiosqlite.connect(data_path) as connect:
-            await connect.execute("PRAGMA foreign_keys = ON;")
-
+        async with self.pool.writer() as connect:
             await connect.execute("""
                 CREATE TABLE IF NOT EXISTS buses (
                     bus_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -46,24 +50,25 @@ class BusStopsManager:
 
     async def create_bus(self, bus_number: str):
         self.check_parameters(bus_number=bus_number)
-        async with aiosqlite.connect(data_path) as connect:
-            await connect.execute("PRAGMA foreign_keys = ON;")
+        async with self.pool.writer() as connect:
             await connect.execute("INSERT INTO buses (bus_number) VALUES (?)", (bus_number,))
             await connect.commit()
+            await self._reload_catalog(connect)
 
     async def delete_bus(self, bus_number: str | None = None, bus_id: int | None = None):
         search_key = self._get_search_key(bus_number, bus_id)
         search_field = "bus_number" if bus_number else "bus_id"
 
-        async with aiosqlite.connect(data_path) as connect:
+        async with self.pool.writer() as connect:
             await connect.execute(f"DELETE FROM buses WHERE {search_field} = ?", (search_key,))
             await connect.commit()
+            await self._reload_catalog(connect)
 
     async def bus_exists(self, bus_number: str | None = None, bus_id: int | None = None) -> bool:
         search_key = self._get_search_key(bus_number, bus_id)
         search_field = "bus_number" if bus_number else "bus_id"
             
-        async with aiosqlite.connect(data_path) as connect:
+        async with self.pool.reader() as connect:
             async with connect.execute(f"SELECT 1 FROM buses WHERE {search_field} = ?", (search_key,)) as cursor:
                 return await cursor.fetchone() is not None
 
@@ -88,7 +93,7 @@ class BusStopsManager:
         if not fields:
             raise ValueError("At least one field must be requested to retrieve bus parameters.")
 
-        async with aiosqlite.connect(data_path) as connect:
+        async with self.pool.reader() as connect:
             async with connect.execute(f"SELECT {', '.join(fields)} FROM buses ORDER BY bus_id") as cursor:
                 rows = await cursor.fetchall()
 
@@ -114,7 +119,7 @@ class BusStopsManager:
         if bus_id is None:
             bus_id = await self.get_bus_id(bus_number)
 
-        async with aiosqlite.connect(data_path) as connect:
+        async with self.pool.writer() as connect:
             async with connect.execute("SELECT COUNT(*) FROM stops WHERE bus_id = ?", (bus_id,)) as cursor:
                 total_stops = (await cursor.fetchone())[0]
 
@@ -132,6 +137,7 @@ class BusStopsManager:
             """, (bus_id, stop_name, stop_order))
 
             await connect.commit()
+            await self._reload_catalog(connect)
 
     async def delete_stop(
         self,
@@ -148,7 +154,7 @@ class BusStopsManager:
         if bus_id is None:
             bus_id = await self.get_bus_id(bus_number)
 
-        async with aiosqlite.connect(data_path) as connect:
+        async with self.pool.writer() as connect:
             if stop_id:
                 async with connect.execute("SELECT stop_order FROM stops WHERE stop_id = ?", (stop_id,)) as cursor:
                     row = await cursor.fetchone()
@@ -172,6 +178,7 @@ class BusStopsManager:
             """, (bus_id, stop_order))
 
             await connect.commit()
+            await self._reload_catalog(connect)
 
     async def delete_all_stops(self, bus_number: str | None = None, bus_id: int | None = None):
         self.check_parameters(bus_number, bus_id)
@@ -179,9 +186,10 @@ class BusStopsManager:
         if bus_id is None:
             bus_id = await self.get_bus_id(bus_number)
 
-        async with aiosqlite.connect(data_path) as connect:
+        async with self.pool.writer() as connect:
             await connect.execute("DELETE FROM stops WHERE bus_id = ?", (bus_id,))
             await connect.commit()
+            await self._reload_catalog(connect)
 
     async def get_stop(
         self,
@@ -203,7 +211,7 @@ class BusStopsManager:
         if not fields:
             raise ValueError("At least one field must be requested to retrieve stop parameters.")
 
-        async with aiosqlite.connect(data_path) as connect:
+        async with self.pool.reader() as connect:
             async with connect.execute(f"SELECT {', '.join(fields)} FROM stops WHERE stop_id = ?", (stop_id,)) as cursor:
                 row = await cursor.fetchone()
 
@@ -236,7 +244,7 @@ class BusStopsManager:
         if not fields:
             raise ValueError("At least one field must be requested to retrieve stop parameters.")
 
-        async with aiosqlite.connect(data_path) as connect:
+        async with self.pool.reader() as connect:
             async with connect.execute(f"SELECT {', '.join(fields)} FROM stops WHERE bus_id = ? ORDER BY stop_order", (bus_id,)) as cursor:
                 rows = await cursor.fetchall()
 
@@ -247,8 +255,24 @@ class BusStopsManager:
             return rows
         return [row[0] for row in rows]
 
+    def get_route(self, bus_number: str) -> tuple[Stop, ...] | None:
+        return self.catalog.get_route(bus_number)
+
+    def find_stop(self, stop_id: int) -> Stop | None:
+        return self.catalog.get_stop(stop_id)
+
+    async def _reload_catalog(self, connect):
+        async with connect.execute("""
+            SELECT buses.bus_number, stops.stop_id, stops.stop_name, stops.stop_order
+            FROM buses LEFT JOIN stops ON stops.bus_id = buses.bus_id
+            ORDER BY buses.bus_id, stops.stop_order
+        """) as cursor:
+            rows = await cursor.fetchall()
+
+        self.catalog = RouteCatalog.from_rows(rows)
+
     async def _get_bus_field(self, return_field: str, search_field: str, search_value: Any) -> Any:
-        async with aiosqlite.connect(data_path) as connect:
+        async with self.pool.reader() as connect:
             async with connect.execute(f"SELECT {return_field} FROM buses WHERE {search_field} = ?", (search_value,)) as cursor:
                 row = await cursor.fetchone()
 
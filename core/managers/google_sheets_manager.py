@@ -1,25 +1,57 @@
 import asyncio
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
-
-import gspread
+import time
+from collections import Counter
 
 from .config_manager import ConfigManager 
 from ..config import google_key_path
+from ..models import Registration, SheetMirror, REGISTRATION_HEADER
+from ..sheets import SheetsClient, SheetsAPIError
+from ..metrics import Histogram, count_call
+from utils.executor import PriorityExecutor, TokenBucketScheduler
 
 
 class GoogleSheetsManager:
     _instance: "GoogleSheetsManager" = None
     _initialized: bool = False
 
+    DEFAULT_BATCH_SIZE = 50
+    DEFAULT_BATCH_LATENCY_MS = 500
+    DEFAULT_QUEUE_SIZE = 1000
+    DEFAULT_RECONCILE_INTERVAL_S = 3600
+    DEFAULT_SNAPSHOT_TTL_MS = 2000
+    DEFAULT_EXECUTOR_WORKERS = 3
+    DEFAULT_REQUESTS_PER_MINUTE = 60
+    DEFAULT_REQUESTS_BURST = 10
+
+    # Driver appends go first, then undo and admin edits, reads wait the longest
+    OPERATION_PRIORITIES = {
+        "append": 0,
+        "delete": 1,
+        "clear": 1,
+        "read": 2
+    }
+
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self):
-        if self._initialized:
-            return
+    @classmethod
+    async def create(cls, client: SheetsClient | None = None):
+        if not cls._initialized:
+            cls._instance = cls()
+            await cls._instance.open(client or cls._create_client())
+            cls._initialized = True
+
+        return cls._instance
+
+    @staticmethod
+    def _create_client() -> SheetsClient:
+        api_url = ConfigManager.app.get("sheets_api_url", SheetsClient.DEFAULT_BASE_URL)
+
+        # The service account key is only ever sent to Google, a local stand-in server gets no credentials
+        if api_url != SheetsClient.DEFAULT_BASE_URL:
+            return SheetsClient(ConfigManager.env["GOOGLE_SHEET_ID"], base_url=api_url)
 
         if not google_key_path.exists():
             raise FileNotFoundError(
@@ -27,168 +59,336 @@ class GoogleSheetsManager:
                 "This file is required to connect to the Google Sheet."
             )
 
-        sheet_id = ConfigManager.env["GOOGLE_SHEET_ID"]
-        sheet_name = ConfigManager.env["GOOGLE_SHEET_NAME"]
-        
-        gc = gspread.service_account(filename=google_key_path)
-        self.sheet = gc.open_by_key(sheet_id).worksheet(sheet_name)
-        
-        all_data = self.sheet.get_all_values() 
-        header = [
-            "Дата",
-            "Время",
-            "Имя",
-            "Номер автобуса",
-            "Остановка",
-            "Кол-во пассажиров"
-        ]
-        
-        if not all_data or len(all_data) <= 1 and all(not cell for cell in all_data[0]):
-            self.sheet.update([header])
-        
-        self._initialized = True
-
-    async def add_row(self, driver_name: str, bus_number: str, stop_name: str, passenger_count: int):
-        tz = ZoneInfo(ConfigManager.app["time_zone"])
-        now = datetime.now(tz)
-        row_data = [
-            now.strftime("%Y-%m-%d"),
-            now.strftime("%H:%M"),
-            driver_name,
-            bus_number,
-            stop_name,
-            passenger_count
-        ]
-        await asyncio.to_thread(
-            self.sheet.append_row,
-            row_data,
-            value_input_option="USER_ENTERED"
+        return SheetsClient(ConfigManager.env["GOOGLE_SHEET_ID"], google_key_path)
+
+    async def open(self, client: SheetsClient):
+        self.client = client
+        self.sheet_title = ConfigManager.env["GOOGLE_SHEET_NAME"]
+
+        self.reconcile_interval = ConfigManager.app.get("sheets_reconcile_interval_s", self.DEFAULT_RECONCILE_INTERVAL_S)
+        self._mirror_lock = asyncio.Lock()
+        self.snapshot_ttl = ConfigManager.app.get("sheets_snapshot_ttl_ms", self.DEFAULT_SNAPSHOT_TTL_MS) / 1000
+        self._snapshot_at: float | None = None
+        self._refresh_task: asyncio.Task | None = None
+
+        self.batch_size = ConfigManager.app.get("sheets_batch_size", self.DEFAULT_BATCH_SIZE)
+        self.batch_latency = ConfigManager.app.get("sheets_batch_latency_ms", self.DEFAULT_BATCH_LATENCY_MS) / 1000
+        self.queue_size = ConfigManager.app.get("sheets_queue_size", self.DEFAULT_QUEUE_SIZE)
+        if self.batch_size <= 0:
+            raise ValueError("Sheets batch size must be a positive integer.")
+
+        self._write_queue: asyncio.Queue[tuple[list, asyncio.Future]] | None = None
+        self._writer_task: asyncio.Task | None = None
+
+        self.executor = PriorityExecutor(
+            ConfigManager.app.get("sheets_executor_workers", self.DEFAULT_EXECUTOR_WORKERS)
+        )
+        self.scheduler = TokenBucketScheduler(
+            ConfigManager.app.get("sheets_requests_per_minute", self.DEFAULT_REQUESTS_PER_MINUTE),
+            ConfigManager.app.get("sheets_requests_burst", self.DEFAULT_REQUESTS_BURST)
         )
 
-    async def delete_nth_last_driver_entry(self, driver_name: str, occurrence_from_end: int = 1):
-        all_data = await asyncio.to_thread(self.sheet.get_all_values)
-        found_count = 0
-        row_to_delete_index = -1
+        self.request_outcomes: Counter[tuple[str, str]] = Counter()
+        self.request_latency: dict[str, Histogram] = {operation: Histogram() for operation in self.OPERATION_PRIORITIES}
 
-        for i in range(len(all_data) - 1, 0, -1):
-            if all_data[i] and len(all_data[i]) > 2 and all_data[i][2] == driver_name:
-                found_count += 1
-                if found_count == occurrence_from_end:
-                    row_to_delete_index = i + 1
+        # The sheet is read in full on first use
+        self.mirror = SheetMirror()
+        self.mirror.invalidate()
+
+        # Connecting must not hold up the bot startup, so it runs in the background
+        self.sheet_id: int | None = None
+        self.grid_rows = 0
+        self._connect_task: asyncio.Task | None = None
+        self._start_connect()
+
+    async def add_row(self, registration: Registration):
+        self._ensure_writer()
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((registration.to_row(), future))
+        await future
+
+    async def close(self):
+        if self._writer_task is not None:
+            await self._write_queue.join()
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+            self._write_queue = None
+
+        connect_task = self._connect_task
+        if connect_task is not None:
+            connect_task.cancel()
+            try:
+                await connect_task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+        await self.client.close()
+
+    def get_executor_stats(self) -> dict:
+        return self.executor.stats()
+
+    def get_quota_stats(self) -> dict:
+        return self.scheduler.stats()
+
+    def get_write_queue_depth(self) -> int:
+        return self._write_queue.qsize() if self._write_queue is not None else 0
+
+    def _ensure_writer(self):
+        if self._writer_task is None or self._writer_task.done():
+            if self._write_queue is None:
+                self._write_queue = asyncio.Queue(maxsize=self.queue_size)
+            self._writer_task = asyncio.create_task(self._write_loop())
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._write_queue.get()]
+            deadline = loop.time() + self.batch_latency
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._write_queue.get(), timeout))
+                except asyncio.TimeoutError:
                     break
 
-        if row_to_delete_index != -1:
-            await asyncio.to_thread(self.sheet.delete_rows, row_to_delete_index)
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
 
-    async def clear_first_n_days(self, n_days: int):
-        if n_days <= 0:
-            return
+    async def _flush(self, batch: list[tuple[list, asyncio.Future]]):
+        rows = [row for row, future in batch if not future.cancelled()]
+        try:
+            if rows:
+                await self._ensure_connected()
+                await self._call(
+                    "append",
+                    self.client.append_values,
+                    self._range("A:F"),
+                    rows,
+                    value_input_option="USER_ENTERED"
+                )
+        except Exception as e:
+            self._invalidate_snapshot()
+            ConfigManager.log.logger.error(f"{e}\n❌ Не удалось записать {len(rows)} строк в гугл таблицу")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            if rows:
+                self._invalidate_snapshot()
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
 
-        all_data = await asyncio.to_thread(self.sheet.get_all_values)
-        if len(all_data) <= 1:
-            return
+    async def delete_registration(self, registration: Registration):
+        priority = self.OPERATION_PRIORITIES["delete"]
+        async with self._mirror_lock:
+            await self._refresh_mirror(priority)
+            sheet_row = await self._find_verified_row(registration.to_row(), priority)
+
+            # No matching row means an earlier attempt already deleted it
+            if sheet_row is not None:
+                await self._run_mirrored("delete", self._delete_rows, [(sheet_row, sheet_row)])
+                self.mirror.delete_row(sheet_row)
+
+    async def clear_until(self, date_to: str):
+        async with self._mirror_lock:
+            await self._refresh_mirror(self.OPERATION_PRIORITIES["clear"])
+            sheet_rows = self.mirror.find_rows_until(date_to)
+            if not sheet_rows:
+                return
+
+            # Runs of adjacent rows become one range each, in date order that is a single range
+            ranges = []
+            for sheet_row in sheet_rows:
+                if ranges and ranges[-1][1] == sheet_row - 1:
+                    ranges[-1] = (ranges[-1][0], sheet_row)
+                else:
+                    ranges.append((sheet_row, sheet_row))
+
+            await self._run_mirrored("delete", self._delete_rows, ranges)
+            self.mirror.delete_rows(sheet_rows)
+
+    async def get_all_data(self) -> list[list[str]]:
+        records = await self._get_records()
+        if not records:
+            return []
+        return [self.mirror.header] + records
+
+    async def _get_records(self) -> list[list[str]]:
+        if not self._is_snapshot_fresh():
+            # Concurrent readers wait for the same fetch instead of starting their own
+            if self._refresh_task is None:
+                self._refresh_task = asyncio.create_task(self._refresh_snapshot())
+                self._refresh_task.add_done_callback(self._on_refresh_done)
+            await asyncio.shield(self._refresh_task)
+        return self.mirror.records
 
-        header = all_data[0]
-        records = all_data[1:]
+    async def _refresh_snapshot(self):
+        async with self._mirror_lock:
+            await self._refresh_mirror()
 
-        unique_dates = sorted(list(set(row[0] for row in records if len(row) > 1)))
+    def _on_refresh_done(self, task: asyncio.Task):
+        self._refresh_task = None
+        if not task.cancelled():
+            task.exception()
 
-        if not unique_dates:
+    async def _refresh_mirror(self, priority: int | None = None):
+        await self._ensure_connected()
+        if self._is_snapshot_fresh():
             return
 
-        if n_days >= len(unique_dates):
-            await asyncio.to_thread(self.sheet.clear)
-            await asyncio.to_thread(self.sheet.update, [header])
+        if self.mirror.needs_reconcile(self.reconcile_interval):
+            values = await self._call("read", self.client.get_values, self._range(), priority=priority)
+            self.mirror.reset(values)
+            self.grid_rows = max(self.grid_rows, len(values))
+            self._snapshot_at = asyncio.get_running_loop().time()
             return
 
-        dates_to_delete = unique_dates[:n_days]
-        data_to_keep = [row for row in records if len(row) <= 1 or row[0] not in dates_to_delete]
+        # Reading below the last row of the grid is an API error, so the row count is checked first
+        first_new_row = self.mirror.high_water_mark + 1
+        if first_new_row > self.grid_rows:
+            await self._update_grid_rows(priority)
+
+        new_rows = []
+        if first_new_row <= self.grid_rows:
+            try:
+                new_rows = await self._call(
+                    "read",
+                    self.client.get_values,
+                    self._range(f"A{first_new_row}:F"),
+                    priority=priority
+                )
+            except Exception:
+                # Rows may have been deleted by hand, the next refresh rereads the whole sheet
+                self.mirror.invalidate()
+                raise
+
+        self.mirror.extend(new_rows)
+        self._snapshot_at = asyncio.get_running_loop().time()
+
+    async def _update_grid_rows(self, priority: int | None = None):
+        properties = await self._call("read", self.client.get_sheet_properties, self.sheet_title, priority=priority)
+        self.grid_rows = properties["gridProperties"]["rowCount"]
+
+    async def _find_verified_row(self, values: list, priority: int) -> int | None:
+        sheet_row = self.mirror.find_row(values)
+        if sheet_row is not None:
+            try:
+                rows = await self._call("read", self.client.get_values, self._range(f"A{sheet_row}:F{sheet_row}"), priority=priority)
+            except Exception:
+                self.mirror.invalidate()
+                raise
+            if rows and SheetMirror.row_matches(rows[0], values):
+                return sheet_row
+
+        # Rows inserted or deleted by hand since the last full read shift the mirror, so it is read again
+        self.mirror.invalidate()
+        self._invalidate_snapshot()
+        await self._refresh_mirror(priority)
+        return self.mirror.find_row(values)
 
-        await asyncio.to_thread(self.sheet.clear)
-        await asyncio.to_thread(self.sheet.update, [header] + data_to_keep)
+    async def _connect(self):
+        properties = await self._call("read", self.client.get_sheet_properties, self.sheet_title)
+        self.grid_rows = properties["gridProperties"]["rowCount"]
 
-    async def was_last_registration_today(self, driver_name: str | None = None) -> bool:
-        tz = ZoneInfo(ConfigManager.app["time_zone"])
-        today = datetime.now(tz).strftime("%Y-%m-%d")
+        # Only the first row is needed to check the header
+        header = await self._call("read", self.client.get_values, self._range("A1:F1"))
+        if not header or all(not cell for cell in header[0]):
+            await self._call("clear", self.client.update_values, self._range("A1"), [REGISTRATION_HEADER])
 
-        all_data = await asyncio.to_thread(self.sheet.get_all_values)
-        if len(all_data) <= 1:
-            return False
+        self.sheet_id = properties["sheetId"]
 
-        records = all_data[1:]
+    async def _ensure_connected(self):
+        if self.sheet_id is None:
+            await asyncio.shield(self._start_connect())
 
-        if driver_name is not None:
-            for row in reversed(records):
-                if len(row) > 2 and row[2] == driver_name:
-                    return row[0] == today
-            return False
+    def _start_connect(self) -> asyncio.Task:
+        # A failed attempt is retried by the next request to the sheet
+        if self._connect_task is None:
+            self._connect_task = asyncio.create_task(self._connect())
+            self._connect_task.add_done_callback(self._on_connect_done)
+        return self._connect_task
+
+    def _on_connect_done(self, task: asyncio.Task):
+        self._connect_task = None
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            ConfigManager.log.logger.warning(f"{task.exception()}\n⚠️ Не удалось подключиться к гугл таблице")
         else:
-            for row in reversed(records):
-                if len(row) > 0 and row[0] == today:
-                    return True
-            return False
-
-    async def get_filters_data(
-            self,
-            date_str: str | None = None,
-            first_days_count: int | None = None,
-            last_days_count: int | None = None,
-            start_date_str: str | None = None,
-            end_date_str: str | None = None,
-            driver_names: list[str] | None = None,
-            bus_numbers: list[str] | None = None
-        ) -> list[list[str]]:
-        all_data = await asyncio.to_thread(self.sheet.get_all_values)
-
-        if len(all_data) <= 1:
-            return []
+            ConfigManager.log.logger.info("Подключение к гугл таблице установлено")
 
-        header = all_data[0]
-        records = all_data[1:]
+    def _is_snapshot_fresh(self) -> bool:
+        return (
+            self._snapshot_at is not None
+            and asyncio.get_running_loop().time() - self._snapshot_at < self.snapshot_ttl
+        )
 
-        if not records:
-            return []
-        
-        unique_dates = sorted(list(set(row[0] for row in records if len(row) > 1)))
-        if date_str:
-            dt_obj = datetime.strptime(date_str, "%Y-%m-%d") 
-            normalized_date_str = dt_obj.strftime("%Y-%m-%d")
-            records = [row for row in records if len(row) > 1 and row[0] == normalized_date_str]
-        elif first_days_count and first_days_count > 0:
-            dates_to_include = unique_dates[:first_days_count] 
-            records = [row for row in records if len(row) > 1 and row[0] in dates_to_include]
-        elif last_days_count and last_days_count > 0:
-            dates_to_include = unique_dates[-last_days_count:]
-            records = [row for row in records if len(row) > 1 and row[0] in dates_to_include]
-        elif start_date_str and end_date_str:
-            date1 = datetime.strptime(start_date_str, "%Y-%m-%d")
-            date2 = datetime.strptime(end_date_str, "%Y-%m-%d")
-            
-            start_dt = min(date1, date2)
-            end_dt = max(date1, date2)
-
-            dates_to_include = set()
-            current_dt = start_dt
-            while current_dt <= end_dt:
-                dates_to_include.add(current_dt.strftime("%Y-%m-%d"))
-                current_dt += timedelta(days=1)
-            
-            records = [
-                row for row in records 
-                if len(row) > 1 and row[0] in dates_to_include
-            ]
+    def _invalidate_snapshot(self):
+        self._snapshot_at = None
 
-        if not records:
-            return []
-        
-        if driver_names:
-            records = [row for row in records if len(row) > 3 and row[2] in driver_names]
-            if not records:
-                return []
-        
-        if bus_numbers:
-            records = [row for row in records if len(row) > 4 and row[3] in bus_numbers]
-            if not records:
-                return []
-
-        return [header] + records
\ No newline at end of file
+    async def _call(self, operation: str, func, *args, priority: int | None = None, **kwargs):
+        if priority is None:
+            priority = self.OPERATION_PRIORITIES[operation]
+
+        count_call("sheets")
+        await self.scheduler.acquire(priority)
+        started_at = time.perf_counter()
+        try:
+            result = await self.executor.run(operation, priority, func, *args, **kwargs)
+        except Exception as e:
+            self.request_latency[operation].observe(time.perf_counter() - started_at)
+            throttled = isinstance(e, SheetsAPIError) and e.code == 429
+            self.request_outcomes[(operation, "throttled" if throttled else "error")] += 1
+            if throttled:
+                self.scheduler.on_throttled(e.retry_after)
+                ConfigManager.log.logger.warning(
+                    f"⚠️ Превышена квота запросов к гугл таблице, "
+                    f"скорость снижена до {self.scheduler.rate * 60:.0f} запросов в минуту"
+                )
+            raise
+
+        self.request_latency[operation].observe(time.perf_counter() - started_at)
+        self.request_outcomes[(operation, "ok")] += 1
+        self.scheduler.on_success()
+        return result
+
+    def _range(self, cells: str | None = None) -> str:
+        title = "'" + self.sheet_title.replace("'", "''") + "'"
+        return f"{title}!{cells}" if cells else title
+
+    async def _delete_rows(self, ranges: list[tuple[int, int]]):
+        # One batchUpdate is applied atomically, ranges go bottom up so the row numbers stay valid
+        await self.client.batch_update([
+            {
+                "deleteDimension": {
+                    "range": {
+                        "sheetId": self.sheet_id,
+                        "dimension": "ROWS",
+                        "startIndex": start_index - 1,
+                        "endIndex": end_index
+                    }
+                }
+            }
+            for start_index, end_index in reversed(ranges)
+        ])
+        self.grid_rows -= sum(end_index - start_index + 1 for start_index, end_index in ranges)
+
+    async def _run_mirrored(self, operation: str, func, *args, **kwargs):
+        try:
+            return await self._call(operation, func, *args, **kwargs)
+        except Exception:
+            self.mirror.invalidate()
+            raise
+        finally:
+            self._invalidate_snapshot()
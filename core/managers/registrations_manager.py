@@ -0,0 +1,395 @@
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, AsyncIterator, TYPE_CHECKING
+from zoneinfo import ZoneInfo
+
+from .config_manager import ConfigManager
+from ..database import SQLitePool
+from ..models import Registration, REGISTRATION_HEADER
+
+if TYPE_CHECKING:
+    from .sheets_outbox_manager import SheetsOutboxManager
+
+
+class RegistrationsManager:
+    _instance: "RegistrationsManager" = None
+    _initialized = False
+
+    _columns = "registration_id, date, time, driver_name, bus_number, stop_name, passenger_count"
+    FETCH_SIZE = 500
+    ROLLUP_GROUP_COLUMNS = ("date", "bus_number", "driver_name", "stop_name")
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @classmethod
+    async def create(cls, outbox: "SheetsOutboxManager | None" = None):
+        if not cls._initialized:
+            cls._instance = cls()
+            cls._instance.outbox = outbox
+            cls._instance.pool = await SQLitePool.create(
+                readers_count=ConfigManager.app.get("db_readers_count", SQLitePool.DEFAULT_READERS_COUNT)
+            )
+            await cls._instance.create_table()
+            cls._initialized = True
+
+        return cls._instance
+
+    async def create_table(self):
+        async with self.pool.writer() as connect:
+            await connect.execute("""
+                CREATE TABLE IF NOT EXISTS registrations (
+                    registration_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date TEXT NOT NULL,
+                    time TEXT NOT NULL,
+                    driver_name TEXT NOT NULL,
+                    bus_number TEXT NOT NULL,
+                    stop_name TEXT NOT NULL,
+                    passenger_count INTEGER
+            );""")
+
+            await connect.execute("CREATE INDEX IF NOT EXISTS idx_registrations_date ON registrations (date, time);")
+            await connect.execute("CREATE INDEX IF NOT EXISTS idx_registrations_driver ON registrations (driver_name, registration_id);")
+            await connect.execute("CREATE INDEX IF NOT EXISTS idx_registrations_bus ON registrations (bus_number, date);")
+            await connect.execute("CREATE INDEX IF NOT EXISTS idx_registrations_stop ON registrations (stop_name, date);")
+
+            await connect.execute("""
+                CREATE TABLE IF NOT EXISTS registration_rollups (
+                    date TEXT NOT NULL,
+                    bus_number TEXT NOT NULL,
+                    driver_name TEXT NOT NULL,
+                    stop_name TEXT NOT NULL,
+                    passenger_sum INTEGER NOT NULL,
+                    rows_count INTEGER NOT NULL,
+                    PRIMARY KEY (date, bus_number, driver_name, stop_name)
+            );""")
+
+            # A new ledger still has to import the sheet history, an existing one already holds it
+            await connect.execute("""
+                CREATE TABLE IF NOT EXISTS sheet_import (
+                    pending INTEGER NOT NULL
+            );""")
+            await connect.execute("""
+                INSERT INTO sheet_import (pending)
+                SELECT NOT EXISTS (SELECT 1 FROM registrations)
+                WHERE NOT EXISTS (SELECT 1 FROM sheet_import)
+            """)
+
+            async with connect.execute("""
+                SELECT EXISTS (SELECT 1 FROM registrations) AND NOT EXISTS (SELECT 1 FROM registration_rollups)
+            """) as cursor:
+                rollups_missing = (await cursor.fetchone())[0]
+            if rollups_missing:
+                await self._rebuild_rollups(connect)
+
+            await connect.commit()
+
+    async def add_registration(
+        self,
+        driver_name: str,
+        bus_number: str,
+        stop_name: str,
+        passenger_count: int
+    ) -> Registration:
+        now = datetime.now(ZoneInfo(ConfigManager.app["time_zone"]))
+        date, time = now.strftime("%Y-%m-%d"), now.strftime("%H:%M")
+
+        async with self.pool.writer() as connect:
+            cursor = await connect.execute("""
+                INSERT INTO registrations (date, time, driver_name, bus_number, stop_name, passenger_count)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (date, time, driver_name, bus_number, stop_name, passenger_count))
+            registration = Registration(cursor.lastrowid, date, time, driver_name, bus_number, stop_name, passenger_count)
+            await cursor.close()
+            await self._add_to_rollups(connect, registration)
+
+            if self.outbox:
+                await self.outbox.enqueue(connect, "append", asdict(registration), registration.registration_id)
+            await connect.commit()
+
+        self._notify_outbox()
+        return registration
+
+    async def import_rows(self, rows: list[list[str]]) -> int:
+        registrations = []
+        for row in rows:
+            if len(row) < 5 or not row[0]:
+                continue
+            passengers_str = row[5].strip() if len(row) > 5 else ""
+            registrations.append((
+                row[0], row[1], row[2], row[3], row[4],
+                int(passengers_str) if passengers_str.isdigit() else None
+            ))
+
+        async with self.pool.writer() as connect:
+            # History goes before the registrations made while it was imported, so "last entry" lookups stay right.
+            # The ids can drop to zero or below, SQLite allows that and AUTOINCREMENT keeps counting from the top
+            async with connect.execute("SELECT MIN(registration_id) FROM registrations") as cursor:
+                min_id = (await cursor.fetchone())[0]
+            first_id = 1 if min_id is None else min_id - len(registrations)
+
+            await connect.executemany("""
+                INSERT INTO registrations (registration_id, date, time, driver_name, bus_number, stop_name, passenger_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [(first_id + index, *registration) for index, registration in enumerate(registrations)])
+            await self._rebuild_rollups(connect)
+            await connect.execute("UPDATE sheet_import SET pending = 0")
+            await connect.commit()
+
+        return len(registrations)
+
+    async def is_sheet_import_pending(self) -> bool:
+        async with self.pool.reader() as connect:
+            async with connect.execute("SELECT pending FROM sheet_import") as cursor:
+                return bool((await cursor.fetchone())[0])
+
+    async def delete_nth_last_driver_entry(self, driver_name: str, occurrence_from_end: int = 1) -> Registration | None:
+        if occurrence_from_end <= 0:
+            raise ValueError("Occurrence from end must be a positive integer.")
+
+        async with self.pool.writer() as connect:
+            async with connect.execute(f"""
+                SELECT {self._columns} FROM registrations
+                WHERE driver_name = ?
+                ORDER BY registration_id DESC
+                LIMIT 1 OFFSET ?
+            """, (driver_name, occurrence_from_end - 1)) as cursor:
+                row = await cursor.fetchone()
+
+            if not row:
+                return None
+
+            await connect.execute("DELETE FROM registrations WHERE registration_id = ?", (row[0],))
+            await self._remove_from_rollups(connect, Registration(*row))
+            if self.outbox and not await self.outbox.cancel_append(connect, row[0]):
+                # The row is found by content, so a retried delete cannot hit another registration
+                await self.outbox.enqueue(connect, "delete_last", {"registration": asdict(Registration(*row))})
+            await connect.commit()
+
+        self._notify_outbox()
+        return Registration(*row)
+
+    async def clear_first_n_days(self, n_days: int) -> int:
+        if n_days <= 0:
+            return 0
+
+        async with self.pool.writer() as connect:
+            async with connect.execute(
+                "SELECT MAX(date) FROM (SELECT DISTINCT date FROM registrations ORDER BY date LIMIT ?)", (n_days,)
+            ) as cursor:
+                date_to = (await cursor.fetchone())[0]
+
+            if date_to is None:
+                return 0
+
+            cursor = await connect.execute("DELETE FROM registrations WHERE date <= ?", (date_to,))
+            deleted_count = cursor.rowcount
+            await cursor.close()
+            await connect.execute("DELETE FROM registration_rollups WHERE date <= ?", (date_to,))
+
+            # The sheet gets the cutoff date rather than a day count, so retries and rows missing from the ledger do not shift it
+            if self.outbox:
+                await self.outbox.enqueue(connect, "clear_days", {"date_to": date_to})
+            await connect.commit()
+
+        self._notify_outbox()
+        return deleted_count
+
+    async def was_last_registration_today(self, driver_name: str | None = None) -> bool:
+        today = datetime.now(ZoneInfo(ConfigManager.app["time_zone"])).strftime("%Y-%m-%d")
+
+        async with self.pool.reader() as connect:
+            if driver_name is not None:
+                query = "SELECT date FROM registrations WHERE driver_name = ? ORDER BY registration_id DESC LIMIT 1"
+                params = (driver_name,)
+            else:
+                query = "SELECT date FROM registrations WHERE date = ? LIMIT 1"
+                params = (today,)
+
+            async with connect.execute(query, params) as cursor:
+                row = await cursor.fetchone()
+
+        return row is not None and row[0] == today
+
+    async def get_filters_data(
+            self,
+            date_str: str | None = None,
+            first_days_count: int | None = None,
+            last_days_count: int | None = None,
+            start_date_str: str | None = None,
+            end_date_str: str | None = None,
+            driver_names: list[str] | None = None,
+            bus_numbers: list[str] | None = None
+        ) -> list[list[str]]:
+        rows = [row async for row in self.iter_filters_data(
+            date_str,
+            first_days_count,
+            last_days_count,
+            start_date_str,
+            end_date_str,
+            driver_names,
+            bus_numbers
+        )]
+
+        if not rows:
+            return []
+
+        return [list(REGISTRATION_HEADER)] + rows
+
+    async def iter_filters_data(
+            self,
+            date_str: str | None = None,
+            first_days_count: int | None = None,
+            last_days_count: int | None = None,
+            start_date_str: str | None = None,
+            end_date_str: str | None = None,
+            driver_names: list[str] | None = None,
+            bus_numbers: list[str] | None = None
+        ) -> AsyncIterator[list[str]]:
+        where_conditions, params = self._build_filters(
+            date_str,
+            first_days_count,
+            last_days_count,
+            start_date_str,
+            end_date_str,
+            driver_names,
+            bus_numbers
+        )
+
+        query = "SELECT date, time, driver_name, bus_number, stop_name, passenger_count FROM registrations"
+        if where_conditions:
+            query += " WHERE " + " AND ".join(where_conditions)
+        query += " ORDER BY registration_id"
+
+        # The reader stays checked out until the generator is closed, callers that can stop early use aclosing()
+        async with self.pool.reader() as connect:
+            async with connect.execute(query, params) as cursor:
+                while rows := await cursor.fetchmany(self.FETCH_SIZE):
+                    for row in rows:
+                        yield [*row[:5], str(row[5]) if row[5] is not None else ""]
+
+    async def get_passenger_sums(
+            self,
+            group_by: list[str],
+            date_str: str | None = None,
+            first_days_count: int | None = None,
+            last_days_count: int | None = None,
+            start_date_str: str | None = None,
+            end_date_str: str | None = None,
+            driver_names: list[str] | None = None,
+            bus_numbers: list[str] | None = None
+        ) -> list[tuple]:
+        for column in group_by:
+            if column not in self.ROLLUP_GROUP_COLUMNS:
+                raise ValueError(f"Invalid rollup column: {column}")
+
+        where_conditions, params = self._build_filters(
+            date_str,
+            first_days_count,
+            last_days_count,
+            start_date_str,
+            end_date_str,
+            driver_names,
+            bus_numbers,
+            table="registration_rollups"
+        )
+
+        columns = ", ".join(group_by)
+        query = f"SELECT {columns + ', ' if columns else ''}SUM(passenger_sum), SUM(rows_count) FROM registration_rollups"
+        if where_conditions:
+            query += " WHERE " + " AND ".join(where_conditions)
+        if columns:
+            query += f" GROUP BY {columns} ORDER BY {columns}"
+
+        async with self.pool.reader() as connect:
+            async with connect.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+
+        return [row for row in rows if row[-1]]
+
+    async def rebuild_rollups(self):
+        async with self.pool.writer() as connect:
+            await self._rebuild_rollups(connect)
+            await connect.commit()
+
+    async def _rebuild_rollups(self, connect):
+        await connect.execute("DELETE FROM registration_rollups")
+        await connect.execute("""
+            INSERT INTO registration_rollups (date, bus_number, driver_name, stop_name, passenger_sum, rows_count)
+            SELECT date, bus_number, driver_name, stop_name, SUM(COALESCE(passenger_count, 0)), COUNT(*)
+            FROM registrations
+            GROUP BY date, bus_number, driver_name, stop_name
+        """)
+
+    async def _add_to_rollups(self, connect, registration: Registration):
+        await connect.execute("""
+            INSERT INTO registration_rollups (date, bus_number, driver_name, stop_name, passenger_sum, rows_count)
+            VALUES (?, ?, ?, ?, COALESCE(?, 0), 1)
+            ON CONFLICT (date, bus_number, driver_name, stop_name) DO UPDATE SET
+                passenger_sum = passenger_sum + excluded.passenger_sum,
+                rows_count = rows_count + 1
+        """, (
+            registration.date,
+            registration.bus_number,
+            registration.driver_name,
+            registration.stop_name,
+            registration.passenger_count
+        ))
+
+    async def _remove_from_rollups(self, connect, registration: Registration):
+        key = (registration.date, registration.bus_number, registration.driver_name, registration.stop_name)
+        await connect.execute("""
+            UPDATE registration_rollups
+            SET passenger_sum = passenger_sum - COALESCE(?, 0), rows_count = rows_count - 1
+            WHERE date = ? AND bus_number = ? AND driver_name = ? AND stop_name = ?
+        """, (registration.passenger_count, *key))
+        await connect.execute("""
+            DELETE FROM registration_rollups
+            WHERE date = ? AND bus_number = ? AND driver_name = ? AND stop_name = ? AND rows_count <= 0
+        """, key)
+
+    def _build_filters(
+            self,
+            date_str: str | None = None,
+            first_days_count: int | None = None,
+            last_days_count: int | None = None,
+            start_date_str: str | None = None,
+            end_date_str: str | None = None,
+            driver_names: list[str] | None = None,
+            bus_numbers: list[str] | None = None,
+            table: str = "registrations"
+        ) -> tuple[list[str], list[Any]]:
+        where_conditions = []
+        params = []
+
+        if date_str:
+            where_conditions.append("date = ?")
+            params.append(datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m-%d"))
+        elif first_days_count and first_days_count > 0:
+            where_conditions.append(f"date IN (SELECT DISTINCT date FROM {table} ORDER BY date LIMIT ?)")
+            params.append(first_days_count)
+        elif last_days_count and last_days_count > 0:
+            where_conditions.append(f"date IN (SELECT DISTINCT date FROM {table} ORDER BY date DESC LIMIT ?)")
+            params.append(last_days_count)
+        elif start_date_str and end_date_str:
+            date1 = datetime.strptime(start_date_str, "%Y-%m-%d")
+            date2 = datetime.strptime(end_date_str, "%Y-%m-%d")
+
+            where_conditions.append("date BETWEEN ? AND ?")
+            params.extend([min(date1, date2).strftime("%Y-%m-%d"), max(date1, date2).strftime("%Y-%m-%d")])
+
+        if driver_names:
+            where_conditions.append(f"driver_name IN ({', '.join(['?'] * len(driver_names))})")
+            params.extend(driver_names)
+
+        if bus_numbers:
+            where_conditions.append(f"bus_number IN ({', '.join(['?'] * len(bus_numbers))})")
+            params.extend(bus_numbers)
+
+        return where_conditions, params
+
+    def _notify_outbox(self):
+        if self.outbox:
+            self.outbox.notify()
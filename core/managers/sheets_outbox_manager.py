@@ -0,0 +1,222 @@
+import asyncio
+import json
+import random
+import time
+from typing import Any
+
+import aiosqlite
+
+from .config_manager import ConfigManager
+from .google_sheets_manager import GoogleSheetsManager
+from ..database import SQLitePool
+from ..models import Registration
+
+
+class SheetsOutboxManager:
+    _instance: "SheetsOutboxManager" = None
+    _initialized = False
+
+    DEFAULT_RETRY_BASE_DELAY_MS = 1000
+    DEFAULT_RETRY_MAX_DELAY_MS = 300_000
+    OPERATIONS = ("append", "delete_last", "clear_days")
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @classmethod
+    async def create(cls, sheets_manager: GoogleSheetsManager):
+        if not cls._initialized:
+            cls._instance = cls()
+            cls._instance.sheets_manager = sheets_manager
+            cls._instance.pool = await SQLitePool.create(
+                readers_count=ConfigManager.app.get("db_readers_count", SQLitePool.DEFAULT_READERS_COUNT)
+            )
+            cls._instance.retry_base_delay = ConfigManager.app.get(
+                "sheets_retry_base_delay_ms", cls.DEFAULT_RETRY_BASE_DELAY_MS
+            ) / 1000
+            cls._instance.retry_max_delay = ConfigManager.app.get(
+                "sheets_retry_max_delay_ms", cls.DEFAULT_RETRY_MAX_DELAY_MS
+            ) / 1000
+            cls._instance._inflight: set[int] = set()
+            cls._instance._wakeup = asyncio.Event()
+            cls._instance._worker_task: asyncio.Task | None = None
+            cls._instance._stopping = False
+            await cls._instance.create_table()
+            cls._initialized = True
+
+        return cls._instance
+
+    async def create_table(self):
+        async with self.pool.writer() as connect:
+            await connect.execute("""
+                CREATE TABLE IF NOT EXISTS sheets_outbox (
+                    operation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    operation TEXT NOT NULL,
+                    registration_id INTEGER,
+                    payload TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL DEFAULT 0,
+                    last_error TEXT
+            );""")
+
+            await connect.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sheets_outbox_registration ON sheets_outbox (registration_id);"
+            )
+
+            await connect.commit()
+
+    def start(self):
+        if self._worker_task is None or self._worker_task.done():
+            self._stopping = False
+            self._worker_task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._worker_task is None:
+            return
+
+        # Let the batch that is being sent finish, otherwise it would be sent again after restart
+        self._stopping = True
+        self.notify()
+        await self._worker_task
+        self._worker_task = None
+
+    def notify(self):
+        self._wakeup.set()
+
+    async def enqueue(
+        self,
+        connect: aiosqlite.Connection,
+        operation: str,
+        payload: dict[str, Any],
+        registration_id: int | None = None
+    ):
+        if operation not in self.OPERATIONS:
+            raise ValueError(f"Unknown outbox operation: {operation}")
+
+        await connect.execute(
+            "INSERT INTO sheets_outbox (operation, registration_id, payload) VALUES (?, ?, ?)",
+            (operation, registration_id, json.dumps(payload, ensure_ascii=False))
+        )
+
+    async def cancel_append(self, connect: aiosqlite.Connection, registration_id: int) -> bool:
+        async with connect.execute(
+            "SELECT operation_id FROM sheets_outbox WHERE operation = 'append' AND registration_id = ?",
+            (registration_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        if not row or row[0] in self._inflight:
+            return False
+
+        await connect.execute("DELETE FROM sheets_outbox WHERE operation_id = ?", (row[0],))
+        return True
+
+    async def get_stats(self) -> dict[str, Any]:
+        async with self.pool.reader() as connect:
+            async with connect.execute(
+                "SELECT COUNT(*), MAX(attempts) FROM sheets_outbox"
+            ) as cursor:
+                pending, max_attempts = await cursor.fetchone()
+
+        return {
+            "pending": pending,
+            "max_attempts": max_attempts or 0
+        }
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                operations, next_attempt_at = await self._claim_operations()
+            except Exception as e:
+                ConfigManager.log.logger.error(f"{e}\n❌ Ошибка при чтении очереди записей в гугл таблицу")
+                operations, next_attempt_at = [], time.time() + self.retry_base_delay
+
+            if not operations:
+                if not self._stopping:
+                    await self._wait(next_attempt_at)
+                continue
+
+            try:
+                await self._process(operations)
+            finally:
+                self._inflight.difference_update(operation[0] for operation in operations)
+
+    async def _wait(self, next_attempt_at: float | None):
+        timeout = None if next_attempt_at is None else max(next_attempt_at - time.time(), 0)
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _claim_operations(self) -> tuple[list[tuple], float | None]:
+        batch_size = self.sheets_manager.batch_size
+
+        async with self.pool.writer() as connect:
+            async with connect.execute(
+                "SELECT operation_id, operation, payload, attempts, next_attempt_at FROM sheets_outbox "
+                "ORDER BY operation_id LIMIT ?",
+                (batch_size,)
+            ) as cursor:
+                rows = await cursor.fetchall()
+
+            if not rows:
+                return [], None
+
+            # Operations are replayed strictly in order, so a delayed head holds back the rest of the queue
+            if rows[0][4] > time.time():
+                return [], rows[0][4]
+
+            if rows[0][1] == "append":
+                operations = []
+                for row in rows:
+                    if row[1] != "append" or row[4] > time.time():
+                        break
+                    operations.append(row)
+            else:
+                operations = [rows[0]]
+
+            self._inflight.update(operation[0] for operation in operations)
+
+        return operations, None
+
+    async def _process(self, operations: list[tuple]):
+        results = await asyncio.gather(
+            *(self._execute(operation, json.loads(payload)) for _, operation, payload, _, _ in operations),
+            return_exceptions=True
+        )
+
+        now = time.time()
+        async with self.pool.writer() as connect:
+            for (operation_id, operation, _, attempts, _), result in zip(operations, results):
+                if not isinstance(result, Exception):
+                    await connect.execute("DELETE FROM sheets_outbox WHERE operation_id = ?", (operation_id,))
+                    continue
+
+                delay = self._get_retry_delay(attempts + 1)
+                ConfigManager.log.logger.warning(
+                    f"⚠️ Операция '{operation}' #{operation_id} для гугл таблицы не выполнена "
+                    f"(попытка {attempts + 1}), повтор через {delay:.1f} с: {result}"
+                )
+                await connect.execute(
+                    "UPDATE sheets_outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE operation_id = ?",
+                    (attempts + 1, now + delay, str(result), operation_id)
+                )
+
+            await connect.commit()
+
+    async def _execute(self, operation: str, payload: dict[str, Any]):
+        if operation == "append":
+            await self.sheets_manager.add_row(Registration(**payload))
+        elif operation == "delete_last":
+            await self.sheets_manager.delete_registration(Registration(**payload["registration"]))
+        elif operation == "clear_days":
+            await self.sheets_manager.clear_until(payload["date_to"])
+        else:
+            raise ValueError(f"Unknown outbox operation: {operation}")
+
+    def _get_retry_delay(self, attempts: int) -> float:
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempts - 1))
+        return random.uniform(delay / 2, delay)
@@ -1,7 +1,9 @@
-import aiosqlite
 from typing import Any
 
-from ..config import data_path
+from .config_manager import ConfigManager
+from ..database import SQLitePool
+from ..models import User
+from utils.cache import LRUCache
 from utils.text.processing import validate_name, validate_phone, validate_role, validate_bus_number, ALLOWED_ROLES
 
 
@@ -9,6 +11,9 @@ class UserManager:
     _instance: "UserManager" = None
     _initialized = False
 
+    DEFAULT_CACHE_SIZE = 1024
+    _MISSING = object()
+
     def __new__(cls, *args, **kwargs):
         
         if cls._instance is None:
@@ -19,15 +24,18 @@ class UserManager:
     async def create(cls):
         if not cls._initialized:
             cls._instance = cls()
+            cls._instance.pool = await SQLitePool.create(
+                readers_count=ConfigManager.app.get("db_readers_count", SQLitePool.DEFAULT_READERS_COUNT)
+            )
+            cls._instance.cache = LRUCache(ConfigManager.app.get("user_cache_size", cls.DEFAULT_CACHE_SIZE))
+            cls._instance._cache_generation = 0
             await cls._instance.create_table()
             cls._initialized = True
         
         return cls._instance
 
     async def create_table(self):
-        async with aiosqlite.connect(data_path) as connect:
-            await connect.execute("PRAGMA foreign_keys = ON;")
-
+        async with self.pool.writer() as connect:
             await connect.execute("""
                 CREATE TABLE IF NOT EXISTS users (
                     phone_number TEXT NOT NULL UNIQUE,
@@ -63,20 +71,44 @@ class UserManager:
         if not fields:
             raise ValueError("At least one field must be requested to retrieve user parameters.")
         
-        async with aiosqlite.connect(data_path) as connect:
-            search_key = self._get_search_key(phone_number, user_id)
-            search_field = "phone_number" if phone_number else "user_id"
-
-            async with connect.execute(f"SELECT {', '.join(fields)} FROM users WHERE {search_field} = ?", (search_key,)) as cursor:
-                row = await cursor.fetchone()
-
-        if not row:
+        user = await self.get_user(phone_number, user_id)
+        if not user:
             return None
 
+        row = [getattr(user, field) for field in fields]
         if len(row) > 1:
-            return list(row)
+            return row
         return row[0]
-    
+
+    async def get_user(self, phone_number: str | None = None, user_id: int | None = None) -> User | None:
+        self.check_parameters(phone_number, user_id)
+
+        search_key = self._get_search_key(phone_number, user_id)
+        search_field = "phone_number" if phone_number else "user_id"
+
+        cached = self.cache.get((search_field, search_key), self._MISSING)
+        if cached is not self._MISSING:
+            return cached
+
+        generation = self._cache_generation
+        async with self.pool.reader() as connect:
+            async with connect.execute(
+                f"SELECT phone_number, user_id, role, name, bus_number FROM users WHERE {search_field} = ?",
+                (search_key,)
+            ) as cursor:
+                row = await cursor.fetchone()
+
+        user = User(*row) if row else None
+
+        if generation == self._cache_generation:
+            self.cache.set((search_field, search_key), user)
+            if user:
+                self.cache.set(("phone_number", user.phone_number), user)
+                if user.user_id is not None:
+                    self.cache.set(("user_id", user.user_id), user)
+
+        return user
+
     async def get_users(
         self,
         roles: list[str] | None = None,
@@ -123,18 +155,16 @@ class UserManager:
                 query_parts.append("OFFSET ?")
                 params.append(offset)
 
-        async with aiosqlite.connect(data_path) as connect:
-            connect.row_factory = aiosqlite.Row 
-            
+        async with self.pool.reader() as connect:
             full_query = " ".join(query_parts)
-            cursor = await connect.execute(full_query, params)
-            
-            rows = await cursor.fetchall()
+            async with connect.execute(full_query, params) as cursor:
+                columns = [column[0] for column in cursor.description]
+                rows = await cursor.fetchall()
             
-            return [dict(row) for row in rows] 
+            return [dict(zip(columns, row)) for row in rows] 
         
     async def get_users_stats(self) -> dict[str, Any]:
-        async with aiosqlite.connect(data_path) as connect:
+        async with self.pool.reader() as connect:
             async with connect.execute("SELECT COUNT(*) FROM users") as cursor:
                 total_users = (await cursor.fetchone())[0]
 
@@ -170,9 +200,7 @@ class UserManager:
         if not fields:
             raise ValueError("At least one field must be provided to create the user.")
 
-        async with aiosqlite.connect(data_path) as connect:
-            await connect.execute("PRAGMA foreign_keys = ON;")
-            
+        async with self.pool.writer() as connect:
             if not await self.user_exists(phone_number):
                 fields_to_insert = fields.copy()
                 if user_id:
@@ -186,6 +214,7 @@ class UserManager:
                     tuple(fields_to_insert.values())
                 )
                 await connect.commit()
+                self._invalidate_cache(phone_number=phone_number, user_id=user_id)
 
     async def set_user(
         self, 
@@ -201,11 +230,10 @@ class UserManager:
         self.check_parameters(phone_number, user_id, new_role, new_name, new_bus_number)
         self.check_parameters(new_phone_number, new_user_id)
 
-        async with aiosqlite.connect(data_path) as connect:
+        async with self.pool.writer() as connect:
             search_key = self._get_search_key(phone_number, user_id)
             search_field = "phone_number" if phone_number else "user_id"
-
-            await connect.execute("PRAGMA foreign_keys = ON;")
+            old_user = await self.get_user(phone_number, user_id)
 
             if new_phone_number:
                 await connect.execute(
@@ -231,41 +259,41 @@ class UserManager:
                 )
 
             await connect.commit()
+            self._invalidate_cache(old_user, phone_number, user_id)
+            self._invalidate_cache(phone_number=new_phone_number, user_id=new_user_id)
 
     async def delete_user(self, phone_number: str | None = None, user_id: int | None = None):
         self.check_parameters(phone_number, user_id)
 
-        async with aiosqlite.connect(data_path) as connect:
+        async with self.pool.writer() as connect:
             search_key = self._get_search_key(phone_number, user_id)
             search_field = "phone_number" if phone_number else "user_id"
+            old_user = await self.get_user(phone_number, user_id)
 
-            await connect.execute("PRAGMA foreign_keys = ON;")
             await connect.execute(f"DELETE FROM users WHERE {search_field} = ?", (search_key,))
             await connect.commit()
+            self._invalidate_cache(old_user, phone_number, user_id)
 
     async def remove_bus_number(self, phone_number: str | None = None, user_id: int | None = None):
         self.check_parameters(phone_number, user_id)
 
-        async with aiosqlite.connect(data_path) as connect:
+        async with self.pool.writer() as connect:
             search_key = self._get_search_key(phone_number, user_id)
             search_field = "phone_number" if phone_number else "user_id"
+            old_user = await self.get_user(phone_number, user_id)
 
-            await connect.execute("PRAGMA foreign_keys = ON;")
             await connect.execute(
                 f"UPDATE users SET bus_number = NULL WHERE {search_field} = ?",
                 (search_key,)
             )
             await connect.commit()
+            self._invalidate_cache(old_user, phone_number, user_id)
 
     async def user_exists(self, phone_number: str | None = None, user_id: int | None = None) -> bool:
-        self.check_parameters(phone_number, user_id)
+        return await self.get_user(phone_number, user_id) is not None
 
-        async with aiosqlite.connect(data_path) as connect:
-            search_key = self._get_search_key(phone_number, user_id)
-            search_field = "phone_number" if phone_number else "user_id"
-            
-            async with connect.execute(f"SELECT 1 FROM users WHERE {search_field} = ?", (search_key,)) as cursor:
-                return await cursor.fetchone() is not None
+    def get_cache_stats(self) -> dict[str, Any]:
+        return self.cache.stats()
     
     def check_parameters(
         self, 
@@ -294,3 +322,18 @@ class UserManager:
             search_key = user_id
         return search_key
 
+    def _invalidate_cache(
+        self,
+        user: User | None = None,
+        phone_number: str | None = None,
+        user_id: int | None = None
+    ):
+        self._cache_generation += 1
+
+        keys = [("phone_number", phone_number), ("user_id", user_id)]
+        if user:
+            keys += [("phone_number", user.phone_number), ("user_id", user.user_id)]
+
+        for key in keys:
+            if key[1] is not None:
+                self.cache.pop(key)
@@ -0,0 +1,3 @@
+from .histogram import Histogram
+from .handler_metrics import HandlerMetrics, HandlerStats, UpdateContext, count_call
+from .prometheus import PrometheusExporter
\ No newline at end of file
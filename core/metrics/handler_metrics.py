@@ -0,0 +1,77 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from .histogram import Histogram
+
+
+@dataclass
+class UpdateContext:
+    router: str | None = None
+    handler: str | None = None
+    calls: Counter[str] = field(default_factory=Counter)
+
+
+@dataclass
+class HandlerStats:
+    latency: Histogram = field(default_factory=Histogram)
+    errors: int = 0
+    calls: Counter[str] = field(default_factory=Counter)
+
+
+_current_update: ContextVar[UpdateContext | None] = ContextVar("current_update", default=None)
+
+
+def count_call(kind: str):
+    # Calls made outside of update handling (background workers) are not attributed to any handler
+    context = _current_update.get()
+    if context is not None:
+        context.calls[kind] += 1
+
+
+class HandlerMetrics:
+    _instance: "HandlerMetrics" = None
+    _initialized: bool = False
+
+    UNHANDLED = "unhandled"
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self.reset()
+        self._initialized = True
+
+    def reset(self):
+        self.handlers: dict[tuple[str, str], HandlerStats] = {}
+        self.started_at = time.time()
+
+    def start_update(self) -> tuple[UpdateContext, object]:
+        context = UpdateContext()
+        return context, _current_update.set(context)
+
+    def finish_update(self, context: UpdateContext, token: object, duration: float, failed: bool):
+        _current_update.reset(token)
+
+        key = (context.router or self.UNHANDLED, context.handler or self.UNHANDLED)
+        stats = self.handlers.get(key)
+        if stats is None:
+            stats = self.handlers[key] = HandlerStats()
+
+        stats.latency.observe(duration)
+        stats.errors += failed
+        stats.calls.update(context.calls)
+
+    @staticmethod
+    def get_current_update() -> UpdateContext | None:
+        return _current_update.get()
+
+    @property
+    def updates_count(self) -> int:
+        return sum(stats.latency.count for stats in self.handlers.values())
@@ -0,0 +1,49 @@
+from bisect import bisect_left
+
+
+class Histogram:
+    # Bucket bounds are in seconds, the same as Prometheus client defaults
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+
+        # Linear interpolation inside the bucket, like histogram_quantile in Prometheus
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if i == len(self.buckets):
+                    return self.max
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = min(self.buckets[i], self.max)
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.max
+
+    def cumulative_counts(self) -> list[tuple[float, int]]:
+        result = []
+        total = 0
+        for bound, bucket_count in zip((*self.buckets, float("inf")), self.counts):
+            total += bucket_count
+            result.append((bound, total))
+        return result
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
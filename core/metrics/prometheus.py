@@ -0,0 +1,157 @@
+from typing import TYPE_CHECKING, Any, Iterable
+
+from aiohttp import web
+
+from .handler_metrics import HandlerMetrics
+from .histogram import Histogram
+
+if TYPE_CHECKING:
+    from ..database import SQLitePool
+    from ..managers import GoogleSheetsManager, SheetsOutboxManager, UserManager
+
+
+class PrometheusExporter:
+    # Everything is collected when /metrics is scraped, handlers only update their counters and histograms
+    PREFIX = "route_tracker"
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(
+            self,
+            pool: "SQLitePool",
+            user_manager: "UserManager",
+            sheets_manager: "GoogleSheetsManager",
+            outbox_manager: "SheetsOutboxManager",
+            handler_metrics: HandlerMetrics | None = None
+        ):
+        self.pool = pool
+        self.user_manager = user_manager
+        self.sheets_manager = sheets_manager
+        self.outbox_manager = outbox_manager
+        self.handler_metrics = handler_metrics or HandlerMetrics()
+        self._runner: web.AppRunner | None = None
+
+    async def start(self, host: str, port: int):
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def render(self) -> str:
+        lines: list[str] = []
+        self._render_handlers(lines)
+        self._render_sqlite(lines)
+        self._render_sheets(lines)
+        await self._render_queues(lines)
+        self._render_cache(lines)
+        return "\n".join(lines) + "\n"
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(body=(await self.render()).encode("utf-8"), headers={"Content-Type": self.CONTENT_TYPE})
+
+    def _render_handlers(self, lines: list[str]):
+        handlers = self.handler_metrics.handlers
+
+        self._header(lines, "updates_total", "counter", "Updates handled, by router and handler")
+        for (router, handler), stats in handlers.items():
+            lines.append(self._sample("updates_total", stats.latency.count, router=router, handler=handler))
+
+        self._header(lines, "update_errors_total", "counter", "Updates whose handler raised an exception")
+        for (router, handler), stats in handlers.items():
+            lines.append(self._sample("update_errors_total", stats.errors, router=router, handler=handler))
+
+        self._header(lines, "handler_calls_total", "counter", "DB connection checkouts and Sheets requests made by handlers")
+        for (router, handler), stats in handlers.items():
+            for kind, count in stats.calls.items():
+                lines.append(self._sample("handler_calls_total", count, router=router, handler=handler, kind=kind))
+
+        self._header(lines, "handler_duration_seconds", "histogram", "Time to handle an update")
+        for (router, handler), stats in handlers.items():
+            self._histogram(lines, "handler_duration_seconds", stats.latency, router=router, handler=handler)
+
+    def _render_sqlite(self, lines: list[str]):
+        # Holding a connection includes the handler work done meanwhile, query time is exported separately
+        self._header(lines, "sqlite_connection_seconds", "histogram", "Time spent waiting for and holding SQLite connections")
+        for kind, histogram in self.pool.timings.items():
+            self._histogram(lines, "sqlite_connection_seconds", histogram, kind=kind)
+
+        shapes = self.pool.profiler.shapes.values()
+        for name, metric_type, help_text, field in (
+            ("sqlite_queries_total", "counter", "SQLite queries executed, by normalized query", "count"),
+            ("sqlite_query_seconds_total", "counter", "Time spent executing SQLite queries and fetching their rows", "total_time"),
+            ("sqlite_query_rows_total", "counter", "Rows returned or changed by SQLite queries", "rows")
+        ):
+            self._header(lines, name, metric_type, help_text)
+            for stats in shapes:
+                lines.append(self._sample(name, getattr(stats, field), query=stats.shape))
+
+    def _render_sheets(self, lines: list[str]):
+        self._header(lines, "sheets_requests_total", "counter", "Google Sheets API requests, by operation and outcome")
+        for (operation, outcome), count in self.sheets_manager.request_outcomes.items():
+            lines.append(self._sample("sheets_requests_total", count, operation=operation, outcome=outcome))
+
+        self._header(lines, "sheets_request_duration_seconds", "histogram", "Google Sheets API request duration")
+        for operation, histogram in self.sheets_manager.request_latency.items():
+            self._histogram(lines, "sheets_request_duration_seconds", histogram, operation=operation)
+
+        quota_stats = self.sheets_manager.get_quota_stats()
+        self._header(lines, "sheets_rate_per_minute", "gauge", "Current Google Sheets request rate limit")
+        lines.append(self._sample("sheets_rate_per_minute", quota_stats["rate_per_minute"]))
+
+    async def _render_queues(self, lines: list[str]):
+        executor_stats = self.sheets_manager.get_executor_stats()
+        self._header(lines, "sheets_queue_depth", "gauge", "Google Sheets requests waiting for a free slot")
+        lines.append(self._sample("sheets_queue_depth", executor_stats["queue_depth"]))
+
+        self._header(lines, "sheets_write_queue_depth", "gauge", "Rows waiting to be appended to the Google Sheet in one batch")
+        lines.append(self._sample("sheets_write_queue_depth", self.sheets_manager.get_write_queue_depth()))
+
+        outbox_stats = await self.outbox_manager.get_stats()
+        self._header(lines, "outbox_pending", "gauge", "Operations in the Google Sheets outbox")
+        lines.append(self._sample("outbox_pending", outbox_stats["pending"]))
+
+    def _render_cache(self, lines: list[str]):
+        cache_stats = self.user_manager.get_cache_stats()
+        for name, metric_type, help_text, value in (
+            ("user_cache_hits_total", "counter", "User cache hits", cache_stats["hits"]),
+            ("user_cache_misses_total", "counter", "User cache misses", cache_stats["misses"]),
+            ("user_cache_hit_ratio", "gauge", "User cache hit ratio since start", cache_stats["hit_ratio"]),
+            ("user_cache_size", "gauge", "Users in the cache", cache_stats["size"])
+        ):
+            self._header(lines, name, metric_type, help_text)
+            lines.append(self._sample(name, value))
+
+    def _histogram(self, lines: list[str], name: str, histogram: Histogram, **labels: str):
+        for bound, count in histogram.cumulative_counts():
+            lines.append(self._sample(f"{name}_bucket", count, **labels, le=self._format_value(bound)))
+        lines.append(self._sample(f"{name}_sum", histogram.sum, **labels))
+        lines.append(self._sample(f"{name}_count", histogram.count, **labels))
+
+    def _header(self, lines: list[str], name: str, metric_type: str, help_text: str):
+        lines.append(f"# HELP {self.PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {self.PREFIX}_{name} {metric_type}")
+
+    def _sample(self, name: str, value: Any, **labels: str) -> str:
+        label_text = self._format_labels(labels.items())
+        return f"{self.PREFIX}_{name}{label_text} {self._format_value(value)}"
+
+    @staticmethod
+    def _format_labels(labels: Iterable[tuple[str, str]]) -> str:
+        parts = []
+        for key, value in labels:
+            value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+            parts.append(f'{key}="{value}"')
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    @staticmethod
+    def _format_value(value: Any) -> str:
+        if value == float("inf"):
+            return "+Inf"
+        if isinstance(value, float):
+            return repr(value)
+        return str(value)
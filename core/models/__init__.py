@@ -0,0 +1,4 @@
+from .user import User
+from .route_catalog import Stop, RouteCatalog
+from .registration import Registration, REGISTRATION_HEADER
+from .sheet_mirror import SheetMirror
\ No newline at end of file
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from typing import Any
+
+
+REGISTRATION_HEADER = [
+    "Дата",
+    "Время",
+    "Имя",
+    "Номер автобуса",
+    "Остановка",
+    "Кол-во пассажиров"
+]
+
+
+@dataclass(frozen=True, slots=True)
+class Registration:
+    registration_id: int | None
+    date: str
+    time: str
+    driver_name: str
+    bus_number: str
+    stop_name: str
+    passenger_count: int | None
+
+    def to_row(self) -> list[Any]:
+        return [
+            self.date,
+            self.time,
+            self.driver_name,
+            self.bus_number,
+            self.stop_name,
+            self.passenger_count
+        ]
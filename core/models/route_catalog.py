@@ -0,0 +1,39 @@
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Iterable, Mapping, NamedTuple
+
+
+class Stop(NamedTuple):
+    stop_id: int
+    stop_name: str
+    stop_order: int
+
+
+@dataclass(frozen=True, slots=True)
+class RouteCatalog:
+    routes: Mapping[str, tuple[Stop, ...]] = field(default_factory=lambda: MappingProxyType({}))
+    stops: Mapping[int, Stop] = field(default_factory=lambda: MappingProxyType({}))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[str, int | None, str | None, int | None]]) -> "RouteCatalog":
+        routes: dict[str, list[Stop]] = {}
+        stops: dict[int, Stop] = {}
+
+        for bus_number, stop_id, stop_name, stop_order in rows:
+            route = routes.setdefault(bus_number, [])
+            if stop_id is None:
+                continue
+            stop = Stop(stop_id, stop_name, stop_order)
+            route.append(stop)
+            stops[stop_id] = stop
+
+        return cls(
+            routes=MappingProxyType({bus_number: tuple(route) for bus_number, route in routes.items()}),
+            stops=MappingProxyType(stops)
+        )
+
+    def get_route(self, bus_number: str) -> tuple[Stop, ...] | None:
+        return self.routes.get(bus_number)
+
+    def get_stop(self, stop_id: int) -> Stop | None:
+        return self.stops.get(stop_id)
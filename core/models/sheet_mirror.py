@@ -0,0 +1,68 @@
+import time
+from bisect import bisect_left
+
+
+class SheetMirror:
+    def __init__(self, values: list[list[str]] | None = None):
+        self.reset(values or [])
+
+    @property
+    def high_water_mark(self) -> int:
+        return len(self.records) + 1
+
+    def reset(self, values: list[list[str]]):
+        self.header = values[0] if values else []
+        self.records: list[list[str]] = []
+        self.driver_rows: dict[str, list[int]] = {}
+        self.extend(values[1:])
+        self.synced_at = time.monotonic()
+
+    def invalidate(self):
+        self.synced_at = None
+
+    def needs_reconcile(self, interval: float) -> bool:
+        return self.synced_at is None or time.monotonic() - self.synced_at >= interval
+
+    def extend(self, rows: list[list[str]]):
+        for row in rows:
+            self.records.append(list(row))
+            if len(row) > 2:
+                self.driver_rows.setdefault(row[2], []).append(self.high_water_mark)
+
+    def delete_row(self, sheet_row: int):
+        row = self.records.pop(sheet_row - 2)
+
+        if len(row) > 2:
+            driver_rows = self.driver_rows[row[2]]
+            del driver_rows[bisect_left(driver_rows, sheet_row)]
+            if not driver_rows:
+                del self.driver_rows[row[2]]
+
+        # Rows below the deleted one move up by one
+        for driver_rows in self.driver_rows.values():
+            i = len(driver_rows) - 1
+            while i >= 0 and driver_rows[i] > sheet_row:
+                driver_rows[i] -= 1
+                i -= 1
+
+    def delete_rows(self, sheet_rows: list[int]):
+        deleted = set(sheet_rows)
+        self.reset([self.header] + [row for index, row in enumerate(self.records, 2) if index not in deleted])
+
+    def find_rows_until(self, date_to: str) -> list[int]:
+        return [index for index, row in enumerate(self.records, 2) if len(row) > 1 and row[0] <= date_to]
+
+    def find_row(self, values: list) -> int | None:
+        for sheet_row in reversed(self.driver_rows.get(values[2], [])):
+            if self.row_matches(self.get_record(sheet_row), values):
+                return sheet_row
+        return None
+
+    @staticmethod
+    def row_matches(record: list[str], values: list) -> bool:
+        # Cells come back from the sheet as strings, an empty cell may be missing at the end of the row
+        expected = ["" if value is None else str(value) for value in values]
+        return record[:len(expected)] + [""] * (len(expected) - len(record)) == expected
+
+    def get_record(self, sheet_row: int) -> list[str]:
+        return self.records[sheet_row - 2]
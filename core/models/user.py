@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class User:
+    phone_number: str
+    user_id: int | None
+    role: str
+    name: str
+    bus_number: str | None = None
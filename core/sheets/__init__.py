@@ -0,0 +1 @@
+from .client import SheetsClient, SheetsAPIError
\ No newline at end of file
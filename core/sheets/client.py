@@ -0,0 +1,127 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote
+
+import aiohttp
+from google.auth.transport.requests import Request
+from google.oauth2 import service_account
+
+
+class SheetsAPIError(Exception):
+    def __init__(self, code: int, message: str, retry_after: float | None = None):
+        super().__init__(f"[{code}]: {message}")
+        self.code = code
+        self.message = message
+        self.retry_after = retry_after
+
+
+class SheetsClient:
+    DEFAULT_BASE_URL = "https://sheets.googleapis.com/v4"
+    DEFAULT_TIMEOUT_S = 30
+    SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+    def __init__(
+            self,
+            spreadsheet_id: str,
+            key_path: Path | None = None,
+            base_url: str = DEFAULT_BASE_URL,
+            timeout: float = DEFAULT_TIMEOUT_S,
+            connections_limit: int = 10
+        ):
+        self.spreadsheet_id = spreadsheet_id
+        self.base_url = base_url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.connections_limit = connections_limit
+
+        # Without a key the client sends unauthenticated requests, which is only useful for a local stand-in server
+        self._credentials = service_account.Credentials.from_service_account_file(
+            str(key_path),
+            scopes=self.SCOPES
+        ) if key_path is not None else None
+        self._token_lock = asyncio.Lock()
+        self._session: aiohttp.ClientSession | None = None
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_sheet_properties(self, title: str) -> dict[str, Any]:
+        data = await self._request("GET", "", params={"fields": "sheets.properties"})
+        for sheet in data.get("sheets", []):
+            if sheet["properties"]["title"] == title:
+                return sheet["properties"]
+        raise SheetsAPIError(404, f"Worksheet {title} was not found")
+
+    async def get_values(self, range_name: str) -> list[list[str]]:
+        data = await self._request("GET", f"/values/{quote(range_name, safe='')}")
+        return data.get("values", [])
+
+    async def append_values(self, range_name: str, values: list[list], value_input_option: str = "RAW") -> dict:
+        return await self._request(
+            "POST",
+            f"/values/{quote(range_name, safe='')}:append",
+            params={"valueInputOption": value_input_option},
+            json={"values": values}
+        )
+
+    async def update_values(self, range_name: str, values: list[list], value_input_option: str = "RAW") -> dict:
+        return await self._request(
+            "PUT",
+            f"/values/{quote(range_name, safe='')}",
+            params={"valueInputOption": value_input_option},
+            json={"values": values}
+        )
+
+    async def clear_values(self, range_name: str) -> dict:
+        return await self._request("POST", f"/values/{quote(range_name, safe='')}:clear")
+
+    async def batch_update(self, requests: list[dict]) -> dict:
+        return await self._request("POST", ":batchUpdate", json={"requests": requests})
+
+    async def _request(self, method: str, path: str, params: dict | None = None, json: Any = None) -> dict:
+        headers = {}
+        token = await self._get_token()
+        if token is not None:
+            headers["Authorization"] = f"Bearer {token}"
+
+        url = f"{self.base_url}/spreadsheets/{self.spreadsheet_id}{path}"
+        async with self._get_session().request(method, url, params=params, json=json, headers=headers) as response:
+            if response.status >= 400:
+                raise await self._build_error(response)
+            return await response.json(content_type=None) or {}
+
+    async def _get_token(self) -> str | None:
+        if self._credentials is None:
+            return None
+
+        # The token lives for an hour, google-auth reports it as invalid a few minutes before it expires
+        if not self._credentials.valid:
+            async with self._token_lock:
+                if not self._credentials.valid:
+                    await asyncio.to_thread(self._credentials.refresh, Request())
+        return self._credentials.token
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(limit=self.connections_limit)
+            )
+        return self._session
+
+    @staticmethod
+    async def _build_error(response: aiohttp.ClientResponse) -> SheetsAPIError:
+        try:
+            error = (await response.json(content_type=None))["error"]
+            message = error.get("message", "")
+        except Exception:
+            message = await response.text()
+
+        retry_after = response.headers.get("Retry-After", "")
+        return SheetsAPIError(
+            response.status,
+            message,
+            float(retry_after) if retry_after.isdigit() else None
+        )
@@ -6,10 +6,16 @@ from aiogram.types import BotCommand
 from aiogram.client.default import DefaultBotProperties
 
 from app.handlers import routers
+from app.middlewares import AuthContextMiddleware, MetricsMiddleware, HandlerNameMiddleware
 from core.managers import UserManager
 from core.managers import BusStopsManager
 from core.managers import ConfigManager
 from core.managers import GoogleSheetsManager
+from core.managers import RegistrationsManager
+from core.managers import SheetsOutboxManager
+from core.database import SQLitePool
+from core.sheets import SheetsClient
+from core.metrics import PrometheusExporter
 from utils.text.processing import validate_phone, validate_name
 
 
@@ -69,6 +75,57 @@ async def check_and_setup_admin(user_manager: UserManager):
     if not admins:
         await setup_initial_admin(user_manager)
 
+async def import_sheet_history(registrations_manager: RegistrationsManager, sheets_manager: GoogleSheetsManager):
+    if not await registrations_manager.is_sheet_import_pending():
+        return
+
+    sheet_data = await sheets_manager.get_all_data()
+    imported_count = await registrations_manager.import_rows(sheet_data[1:])
+    ConfigManager.log.logger.info(f"Импортировано {imported_count} записей из гугл таблицы в локальную базу")
+
+async def start_sheet_sync(
+    registrations_manager: RegistrationsManager,
+    sheets_manager: GoogleSheetsManager,
+    outbox_manager: SheetsOutboxManager
+):
+    # The outbox starts after the import, so registrations made meanwhile are not read back as history
+    delay = outbox_manager.retry_base_delay
+    while True:
+        try:
+            await import_sheet_history(registrations_manager, sheets_manager)
+            break
+        except Exception as e:
+            ConfigManager.log.logger.error(
+                f"{e}\n❌ Не удалось импортировать записи из гугл таблицы, повтор через {delay:.0f} с"
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, outbox_manager.retry_max_delay)
+    outbox_manager.start()
+
+async def build_dispatcher(sheets_client: SheetsClient | None = None) -> Dispatcher:
+    dp = Dispatcher()
+    dp.update.outer_middleware(MetricsMiddleware())
+    dp.update.outer_middleware(AuthContextMiddleware())
+    handler_name_middleware = HandlerNameMiddleware()
+    dp.message.middleware(handler_name_middleware)
+    dp.callback_query.middleware(handler_name_middleware)
+
+    dp["user_manager"] = await UserManager().create()
+    dp["bus_stops_manager"] = await BusStopsManager().create()
+    dp["sheets_manager"] = sheets_manager = await GoogleSheetsManager().create(sheets_client)
+    dp["outbox_manager"] = outbox_manager = await SheetsOutboxManager().create(sheets_manager)
+    dp["registrations_manager"] = await RegistrationsManager().create(outbox_manager)
+
+    for router in routers:
+        dp.include_router(router)
+
+    return dp
+
+async def close_dispatcher(dp: Dispatcher):
+    await dp["outbox_manager"].close()
+    await dp["sheets_manager"].close()
+    await SQLitePool().close()
+
 async def main():
     bot = Bot(
         token=ConfigManager.env["TELEGRAM_BOT_TOKEN"],
@@ -81,20 +138,33 @@ async def main():
         BotCommand(command="my_details", description="Информация о мне"),
     ])
 
-    dp = Dispatcher()
-
-    user_manager = await UserManager().create()
-    dp["user_manager"] = user_manager
-    dp["bus_stops_manager"] = await BusStopsManager().create()
-    dp["sheets_manager"] = GoogleSheetsManager()
-    
-    await check_and_setup_admin(user_manager)
+    dp = await build_dispatcher()
     
-    for router in routers:
-        dp.include_router(router)
+    await check_and_setup_admin(dp["user_manager"])
+
+    exporter = None
+    metrics_port = ConfigManager.app.get("metrics_port", 0)
+    if metrics_port:
+        exporter = PrometheusExporter(SQLitePool(), dp["user_manager"], dp["sheets_manager"], dp["outbox_manager"])
+        await exporter.start(ConfigManager.app.get("metrics_host", "127.0.0.1"), metrics_port)
+        ConfigManager.log.logger.info(f"Метрики доступны на порту {metrics_port}")
 
+    # Google Sheets may be slow or unavailable, polling starts without waiting for it
+    sheet_sync_task = asyncio.create_task(
+        start_sheet_sync(dp["registrations_manager"], dp["sheets_manager"], dp["outbox_manager"])
+    )
     ConfigManager.log.logger.info("Бот запущен")
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        sheet_sync_task.cancel()
+        try:
+            await sheet_sync_task
+        except asyncio.CancelledError:
+            pass
+        if exporter is not None:
+            await exporter.stop()
+        await close_dispatcher(dp)
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,2 @@
+from .priority_executor import PriorityExecutor
+from .token_bucket import TokenBucketScheduler
\ No newline at end of file
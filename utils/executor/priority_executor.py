@@ -0,0 +1,101 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable
+
+
+class PriorityExecutor:
+    # At most max_workers calls run at once, queued calls start in priority order, lower value first
+    def __init__(self, max_workers: int):
+        if max_workers <= 0:
+            raise ValueError("Executor workers count must be a positive integer.")
+
+        self.max_workers = max_workers
+        self._active = 0
+        self._counter = itertools.count()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._stats: dict[str, dict[str, float]] = {}
+
+    async def run(self, operation: str, priority: int, func: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        values = self._get_operation_stats(operation)
+        values["pending"] += 1
+        submitted_at = time.monotonic()
+        try:
+            await self._acquire(priority)
+        finally:
+            values["pending"] -= 1
+
+        started_at = time.monotonic()
+        failed = False
+        try:
+            return await func(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._release()
+            self._record(values, started_at - submitted_at, time.monotonic() - started_at, failed)
+
+    def stats(self) -> dict[str, Any]:
+        operations = {}
+        for operation, values in self._stats.items():
+            calls = values["calls"]
+            operations[operation] = {
+                "pending": int(values["pending"]),
+                "calls": int(calls),
+                "errors": int(values["errors"]),
+                "avg_wait_ms": values["wait_total"] / calls * 1000 if calls else 0.0,
+                "max_wait_ms": values["wait_max"] * 1000,
+                "avg_duration_ms": values["duration_total"] / calls * 1000 if calls else 0.0,
+                "max_duration_ms": values["duration_max"] * 1000
+            }
+
+        return {
+            "workers": self.max_workers,
+            "active": self._active,
+            "queue_depth": sum(not future.done() for _, _, future in self._waiters),
+            "operations": operations
+        }
+
+    async def _acquire(self, priority: int):
+        if self._active < self.max_workers and not self._waiters:
+            self._active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot was already handed over when the caller was cancelled, pass it on
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # The slot goes straight to the next caller, so the active count stays the same
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    @staticmethod
+    def _record(values: dict[str, float], wait: float, duration: float, failed: bool):
+        values["calls"] += 1
+        values["errors"] += failed
+        values["wait_total"] += wait
+        values["wait_max"] = max(values["wait_max"], wait)
+        values["duration_total"] += duration
+        values["duration_max"] = max(values["duration_max"], duration)
+
+    def _get_operation_stats(self, operation: str) -> dict[str, float]:
+        values = self._stats.get(operation)
+        if values is None:
+            values = self._stats[operation] = dict.fromkeys(
+                ("pending", "calls", "errors", "wait_total", "wait_max", "duration_total", "duration_max"),
+                0
+            )
+        return values
@@ -0,0 +1,99 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any
+
+
+class TokenBucketScheduler:
+    # When the quota is exhausted, waiting calls get tokens in priority order, lower value first
+    RECOVERY_STEPS = 20
+
+    def __init__(self, rate_per_minute: float, burst: int, min_rate_per_minute: float | None = None):
+        if rate_per_minute <= 0 or burst <= 0:
+            raise ValueError("Rate and burst must be positive.")
+
+        self.max_rate = rate_per_minute / 60
+        self.min_rate = (min_rate_per_minute or rate_per_minute / 10) / 60
+        self.rate = self.max_rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.throttled_count = 0
+
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._counter = itertools.count()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._wakeup: asyncio.TimerHandle | None = None
+
+    async def acquire(self, priority: int):
+        self._refill()
+        if not self._waiters and self.tokens >= 1 and time.monotonic() >= self._paused_until:
+            self.tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._schedule(0)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The token was already granted when the caller was cancelled, return it
+            if future.done() and not future.cancelled():
+                self.tokens += 1
+                self._schedule(0)
+            raise
+
+    def on_success(self):
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / self.RECOVERY_STEPS)
+
+    def on_throttled(self, retry_after: float | None = None):
+        self.throttled_count += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0.0
+        self._paused_until = max(self._paused_until, time.monotonic() + (retry_after or 1 / self.rate))
+
+    def stats(self) -> dict[str, Any]:
+        waiting: dict[int, int] = {}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                waiting[priority] = waiting.get(priority, 0) + 1
+
+        return {
+            "rate_per_minute": self.rate * 60,
+            "max_rate_per_minute": self.max_rate * 60,
+            "tokens": self.tokens,
+            "throttled": self.throttled_count,
+            "waiting": waiting
+        }
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _schedule(self, delay: float):
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _dispatch(self):
+        self._wakeup = None
+        self._refill()
+        now = time.monotonic()
+
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if now < self._paused_until or self.tokens < 1:
+                break
+
+            heapq.heappop(self._waiters)
+            self.tokens -= 1
+            future.set_result(None)
+
+        if self._waiters:
+            self._schedule(max(self._paused_until - now, (1 - self.tokens) / self.rate, 0))
@@ -1 +1,3 @@
-from .file_name_generator import generate_file_name
\ No newline at end of file
+from .file_name_generator import generate_file_name
+from .report_writer import ReportWriter, ReportInputFile
+from .registration_export import write_registrations_export, EXPORT_FORMATS
\ No newline at end of file
@@ -0,0 +1,85 @@
+import asyncio
+import csv
+import io
+import zlib
+from typing import AsyncIterator
+
+from openpyxl import Workbook
+
+from core.models import REGISTRATION_HEADER
+from .report_writer import ReportWriter
+
+
+XLSX_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "csv": "csv",
+    "csv_gz": "csv.gz",
+    "xlsx": "xlsx"
+}
+
+
+async def write_registrations_export(
+    rows: AsyncIterator[list[str]],
+    export_format: str,
+    report: ReportWriter
+) -> int:
+    if export_format == "xlsx":
+        return await _write_xlsx(rows, report)
+    if export_format in ("csv", "csv_gz"):
+        return await _write_csv(rows, report, compress=export_format == "csv_gz")
+    raise ValueError(f"Unknown export format: {export_format}")
+
+
+async def _write_csv(rows: AsyncIterator[list[str]], report: ReportWriter, compress: bool) -> int:
+    # wbits=31 makes zlib produce a gzip stream, so the file is compressed chunk by chunk
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        report.write_bytes(compressor.compress(data) if compressor else data)
+
+    # BOM lets Excel detect UTF-8 and show Cyrillic correctly
+    buffer.write("\ufeff")
+    writer.writerow(REGISTRATION_HEADER)
+    rows_count = 0
+    async for row in rows:
+        writer.writerow(row)
+        rows_count += 1
+        if buffer.tell() >= 64 * 1024:
+            flush()
+
+    flush()
+    if compressor:
+        report.write_bytes(compressor.flush())
+
+    return rows_count
+
+
+async def _write_xlsx(rows: AsyncIterator[list[str]], report: ReportWriter) -> int:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Регистрации")
+    sheet.append(REGISTRATION_HEADER)
+
+    def append_rows(batch: list[list]):
+        for row in batch:
+            sheet.append(row)
+
+    # Building the XLSX is CPU work, so it runs in a thread and polling is not stalled
+    rows_count = 0
+    batch = []
+    async for row in rows:
+        passengers_str = row[5]
+        batch.append([*row[:5], int(passengers_str) if passengers_str.isdigit() else None])
+        rows_count += 1
+        if len(batch) >= XLSX_BATCH_SIZE:
+            await asyncio.to_thread(append_rows, batch)
+            batch = []
+
+    await asyncio.to_thread(append_rows, batch)
+    await asyncio.to_thread(workbook.save, report.file)
+    return rows_count
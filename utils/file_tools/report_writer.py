@@ -0,0 +1,57 @@
+from tempfile import SpooledTemporaryFile
+from typing import AsyncGenerator
+
+from aiogram import Bot
+from aiogram.types import InputFile
+from aiogram.types.input_file import DEFAULT_CHUNK_SIZE
+
+
+class ReportWriter:
+    DEFAULT_MAX_MEMORY_SIZE = 1024 * 1024
+
+    def __init__(self, max_memory_size: int = DEFAULT_MAX_MEMORY_SIZE, encoding: str = "utf-8"):
+        self.encoding = encoding
+        self.length = 0
+        self._file = SpooledTemporaryFile(max_size=max_memory_size, mode="w+b")
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def file(self) -> SpooledTemporaryFile:
+        return self._file
+
+    def write(self, text: str):
+        self._file.write(text.encode(self.encoding))
+        self.length += len(text)
+
+    def write_bytes(self, data: bytes):
+        self._file.write(data)
+
+    def getvalue(self) -> str:
+        self._file.seek(0)
+        return self._file.read().decode(self.encoding)
+
+    def as_input_file(self, filename: str) -> "ReportInputFile":
+        return ReportInputFile(self, filename)
+
+    def read_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._file.seek(0)
+        while chunk := self._file.read(chunk_size):
+            yield chunk
+
+    def close(self):
+        self._file.close()
+
+
+class ReportInputFile(InputFile):
+    def __init__(self, report: ReportWriter, filename: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        super().__init__(filename=filename, chunk_size=chunk_size)
+        self.report = report
+
+    async def read(self, bot: Bot) -> AsyncGenerator[bytes, None]:
+        for chunk in self.report.read_chunks(self.chunk_size):
+            yield chunk